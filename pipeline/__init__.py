@@ -0,0 +1,18 @@
+"""Build the Student_Data workbook of the web app from the raw student records.
+
+Each stage is a function of dataframes that leaves its inputs untouched,
+so stages can be run, timed and replaced on their own.
+"""
+from .clean import clean, clean_registration, clean_biodata, clean_result, suggest_biodata_mappings
+from .recode import recode, suggest_mapping, remap_codes, recoded_categorical
+from .enrich import enrich
+from .gpa import gpa, gpa_from_sums, semester_sums, semester_gpa, semester_totals
+from .classification import CLASS_BOUNDARIES, classify_scores
+from .first_last import first_last
+from .ingest import ingest
+from .parallel import partition_students, student_stages, parallel_student_stages
+from .stream import iter_chunks, stream_results
+from .write import write, write_streaming
+from .parquet import arrow_safe, write_parquet, read_parquet, read_parquet_table, read_students, write_ingested
+from .run import (StageReport, read_records, read_dataset, read_results, write_dataset, run_stage,
+                  run_pipeline, run_ingest, run_streaming)
@@ -0,0 +1,82 @@
+import argparse
+import json
+import logging
+import os
+
+from .classification import CLASS_BOUNDARIES
+from .clean import suggest_biodata_mappings
+from .run import run_pipeline, run_ingest, run_streaming
+from .stream import CHUNK_SIZE
+
+# The workbook the web app reads
+default_output = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              'web_app', 'Student_Data.xlsx')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m pipeline',
+                                     description="Build Student_Data.xlsx from the raw student records.")
+    parser.add_argument('input', help="raw records workbook (StudentRec_.xlsx)")
+    parser.add_argument('-o', '--output', default=default_output,
+                        help="workbook to write, or Parquet dataset directory if the name ends in "
+                             ".parquet (default: %(default)s)")
+    parser.add_argument('--ingest', metavar='RESULTS',
+                        help="add a batch of new Result rows (.xlsx or .csv) to the workbook given by "
+                             "--output instead of rebuilding it; the input workbook only supplies "
+                             "the course lists")
+    parser.add_argument('--boundaries', metavar='JSON',
+                        help="JSON file of [class, lower bound] pairs from the highest class down "
+                             "(default: the standard degree classes)")
+    parser.add_argument('--recodings', metavar='JSON',
+                        help="JSON file of extra Biodata corrections, {column: {variant: value}}")
+    parser.add_argument('--suggest-recodings', metavar='JSON',
+                        help="write corrections proposed for the Biodata variants no correction "
+                             "covers to this JSON file, in the form --recodings takes (not applied)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="processes running the GPA and first/last stages (default: %(default)s)")
+    parser.add_argument('--stream', action='store_true',
+                        help="process the Result sheet in chunks, in bounded memory")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE,
+                        help="Result rows per chunk with --stream (default: %(default)s)")
+    parser.add_argument('--spill-dir', help="directory for the chunks spilled with --stream "
+                                            "(default: the system temporary directory)")
+    parser.add_argument('-q', '--quiet', action='store_true', help="do not print the stage timings")
+    parser.add_argument('-v', '--verbose', action='store_true', help="log each stage as it finishes")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format='%(message)s')
+    boundaries = CLASS_BOUNDARIES
+    if args.boundaries:
+        with open(args.boundaries) as boundaries_file:
+            boundaries = [(name, float(bound)) for name, bound in json.load(boundaries_file)]
+
+    mappings = None
+    if args.recodings:
+        with open(args.recodings) as recodings_file:
+            mappings = json.load(recodings_file)
+
+    if args.ingest:
+        tables, reports = run_ingest(args.input, args.ingest, args.output, boundaries=boundaries)
+    elif args.stream:
+        tables, reports = run_streaming(args.input, args.output, args.chunk_size, boundaries, args.spill_dir,
+                                        mappings)
+    else:
+        tables, reports = run_pipeline(args.input, args.output, boundaries, args.workers, mappings)
+
+    if args.suggest_recodings and 'Biodata' in tables:
+        suggestions = suggest_biodata_mappings(tables['Biodata'], mappings)
+        with open(args.suggest_recodings, 'w') as suggestions_file:
+            json.dump(suggestions, suggestions_file, indent=2)
+        if not args.quiet:
+            print(f"{sum(map(len, suggestions.values()))} Biodata corrections suggested in {args.suggest_recodings}")
+
+    if not args.quiet:
+        print(f"{'stage':<20}{'rows':>10}{'seconds':>10}")
+        for report in reports:
+            print(f"{report.stage:<20}{report.rows:>10}{report.seconds:>10.2f}")
+        print(f"{'total':<20}{'':>10}{sum(report.seconds for report in reports):>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
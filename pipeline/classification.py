@@ -0,0 +1,56 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Degree classes from the highest, with the lowest GPA of each. A class
+# covers every score from its lower bound up to the lower bound of the
+# class above it, so the classes leave no gaps
+CLASS_BOUNDARIES = [
+    ('First Class', 4.50),
+    ('Second Class Upper', 3.50),
+    ('Second Class Lower', 2.40),
+    ('Third Class', 1.50),
+    ('Pass', 1.00),
+    ('Fail', 0.00),
+]
+
+# Highest possible GPA
+MAXIMUM_SCORE = 5.00
+
+
+def classify_scores(scores, boundaries=CLASS_BOUNDARIES, maximum=MAXIMUM_SCORE):
+    """Classify a column of GPAs or CGPAs into an ordered categorical.
+
+    `boundaries` lists (class, lower bound) pairs from the highest class
+    down. Every score is located among the sorted lower bounds with one
+    binary search over the whole column. Scores that are missing (e.g. a
+    CGPA over no course units) or outside [lowest bound, maximum] get the
+    lowest class, as in the notebook, with a warning, so every student is
+    still counted in some class. The categories are ordered from the
+    highest class, and a Series comes back as a Series with the same index.
+    """
+    classes = [name for name, _ in boundaries]
+    lower_bounds = np.array([bound for _, bound in boundaries], dtype=float)
+    if len(lower_bounds) == 0 or (np.diff(lower_bounds) >= 0).any() or lower_bounds[0] > maximum:
+        raise ValueError("Class boundaries must be strictly decreasing and at most the maximum score")
+
+    values = np.asarray(scores, dtype=float)
+    breakpoints = lower_bounds[::-1]
+    # Position of the highest lower bound at or below each score, counted
+    # from the lowest class
+    positions = np.searchsorted(breakpoints, values, side='right') - 1
+    codes = len(classes) - 1 - positions
+
+    out_of_range = ~((values >= breakpoints[0]) & (values <= maximum))
+    if out_of_range.any():
+        codes[out_of_range] = len(classes) - 1
+        logger.warning("%d scores missing or outside %.2f-%.2f were given the class %r",
+                       int(out_of_range.sum()), breakpoints[0], maximum, classes[-1])
+
+    classification = pd.Categorical.from_codes(codes, classes, ordered=True)
+    if isinstance(scores, pd.Series):
+        return pd.Series(classification, index=scores.index, name=scores.name)
+    return classification
@@ -0,0 +1,74 @@
+from .mappings import (year_to_level, biodata_fill_values, biodata_mappings,
+                       gst_course_codes)
+from .recode import recode, suggest_mapping
+
+
+def clean_registration(registration):
+    """Drop incomplete registrations and add the Level of each one."""
+    # The missing entries are all in the Year column
+    registration = registration.dropna()
+    registration = registration.assign(Year=registration['Year'].astype(int))
+    return registration.assign(Level=registration['Year'].map(year_to_level))
+
+
+def _biodata_mappings(mappings):
+    # The corrections of biodata_mappings and the extra ones, for every
+    # column that has either or a fill value
+    return {column: {**biodata_mappings.get(column, {}), **(mappings or {}).get(column, {})}
+            for column in dict.fromkeys([*biodata_mappings, *(mappings or {}), *biodata_fill_values])}
+
+
+def clean_biodata(biodata, mappings=None):
+    """Fill in missing Biodata entries and fix their spelling.
+
+    `mappings` adds {column: {variant: value}} corrections to those of
+    biodata_mappings. Variants without a correction are kept as they are
+    (see suggest_biodata_mappings).
+    """
+    mappings = _biodata_mappings(mappings)
+
+    # Every column is recoded on its distinct values, the missing entries
+    # filled first; rows still missing something are then dropped
+    biodata = biodata.assign(**{column: recode(biodata[column], mapping, biodata_fill_values.get(column))
+                                for column, mapping in mappings.items() if column in biodata.columns})
+    biodata = biodata.dropna()
+    return biodata.assign(YOA=biodata['YOA'].astype(int))
+
+
+def suggest_biodata_mappings(biodata, mappings=None):
+    """Propose corrections for the Biodata variants no mapping covers.
+
+    Works on raw or cleaned Biodata. Returns {column: {variant: value}},
+    the form `mappings` takes, for the columns with suggestions, so they
+    can be reviewed and passed back to clean_biodata; nothing is applied.
+    """
+    suggestions = {}
+    for column, mapping in _biodata_mappings(mappings).items():
+        if column in biodata.columns:
+            column_suggestions = suggest_mapping(biodata[column].dropna().unique(), mapping)
+            if column_suggestions:
+                suggestions[column] = column_suggestions
+    return suggestions
+
+
+def clean_result(result):
+    """Normalise the course codes and grades of the results and drop unusable rows."""
+    result = result.assign(**{column: result[column].str.upper()
+                              for column in ['Course_Code', 'Grade', 'Course_Code_Key']})
+
+    # Dropping the GST courses, then the rows without a course unit
+    result = result[~result['Course_Code'].isin(gst_course_codes)]
+    result = result.dropna(subset=['Course_Unit'])
+
+    # A missing mark with an F grade is a mark of 0
+    condition = result['Mark'].isnull() & (result['Grade'] == 'F')
+    return result.assign(Mark=result['Mark'].mask(condition, 0))
+
+
+def clean(sheets, mappings=None):
+    """Clean stage: the Registration, Biodata and Result sheets of the raw records."""
+    return {
+        'Registration': clean_registration(sheets['Registration']),
+        'Biodata': clean_biodata(sheets['Biodata'], mappings),
+        'Result': clean_result(sheets['Result']),
+    }
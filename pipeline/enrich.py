@@ -0,0 +1,31 @@
+from .mappings import grade_points_dict
+
+# Columns of the Result_sheet table
+RESULT_SHEET_COLUMNS = ['Matric_Number', 'Session', 'Semester', 'Level', 'Course_Code', 'Course_Title',
+                        'Lecturer', 'Mark', 'Grade', 'Course_Unit', 'Grade_Points', 'Points_Earned']
+
+
+def enrich(result, courses, lecturers):
+    """Enrich stage: add grade points, course titles, levels and lecturers to the results.
+
+    `courses` is the Courses sheet (Course_Code, Course_Title, Level) and
+    `lecturers` the sheet of Course_Code and Lecturer. Returns the
+    Result_sheet table.
+    """
+    grade_points = result['Grade'].map(grade_points_dict)
+
+    # Course details by Course Code; courses that are not listed get a
+    # Level of '-' and a title and lecturer of '-'
+    course_codes = result['Course_Code']
+    course_title = course_codes.map(dict(zip(courses['Course_Code'], courses['Course_Title'])))
+    level = course_codes.map(dict(zip(courses['Course_Code'], courses['Level']))).fillna(0).astype(int)
+    lecturer = course_codes.map(dict(zip(lecturers['Course_Code'], lecturers['Lecturer'])))
+
+    result = result.assign(
+        Grade_Points=grade_points,
+        Points_Earned=result['Course_Unit'] * grade_points,
+        Course_Title=course_title.fillna('-'),
+        Level=level.astype(object).replace({0: '-'}),
+        Lecturer=lecturer.fillna('-'),
+    )
+    return result[RESULT_SHEET_COLUMNS]
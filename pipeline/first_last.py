@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+from .classification import CLASS_BOUNDARIES, classify_scores
+from .gpa import SEMESTER_KEYS
+
+# Columns taken from the first and the last semester of every student
+FIRST_COLUMNS = {'Session': 'First_Session', 'GPA': 'First_GPA', 'CGPA': 'First_CGPA'}
+LAST_COLUMNS = {'Session': 'Last_Session', 'GPA': 'Last_GPA', 'CGPA': 'Last_CGPA'}
+
+# Classification columns carried over from the first and the last semester
+# when they are not classified again
+FIRST_CLASSIFICATIONS = {'GPA_Classification': 'First_GPA_Classification',
+                         'CGPA_Classification': 'First_CGPA_Classification'}
+LAST_CLASSIFICATIONS = {'GPA_Classification': 'Last_GPA_Classification',
+                        'CGPA_Classification': 'Last_CGPA_Classification'}
+
+# Columns of the First_and_Last_Result table
+FIRST_AND_LAST_COLUMNS = ['Matric_Number', 'First_Session', 'Last_Session', 'First_GPA', 'First_CGPA',
+                          'Last_GPA', 'Last_CGPA', 'First_GPA_Classification', 'First_CGPA_Classification',
+                          'Last_GPA_Classification', 'Last_CGPA_Classification']
+
+
+def first_last(academic_performance, boundaries=CLASS_BOUNDARIES):
+    """First/last stage: the first and last semester of every student.
+
+    Returns the First_and_Last_Result table: the first and last session,
+    GPA and CGPA of each student and their classifications by `boundaries`.
+    With `boundaries` None, the classifications are those of the first and
+    last semesters in `academic_performance`, whatever boundaries it was
+    classified by. The semesters are sorted once, and every student's first and last rows
+    are found where the student changes, so no Python runs per student.
+    """
+    sorted_result = academic_performance.sort_values(by=SEMESTER_KEYS, kind='stable')
+    sorted_result = sorted_result[sorted_result['Matric_Number'].notna()]
+
+    # Rows where a new student starts, and the rows just before them
+    students = sorted_result['Matric_Number'].to_numpy()
+    starts = np.ones(len(students), dtype=bool)
+    starts[1:] = students[1:] != students[:-1]
+    first_rows = np.flatnonzero(starts)
+    last_rows = np.append(first_rows[1:], len(students)) - 1
+
+    first_columns = FIRST_COLUMNS if boundaries is not None else {**FIRST_COLUMNS, **FIRST_CLASSIFICATIONS}
+    last_columns = LAST_COLUMNS if boundaries is not None else {**LAST_COLUMNS, **LAST_CLASSIFICATIONS}
+    first = sorted_result.iloc[first_rows]
+    last = sorted_result.iloc[last_rows]
+    first_and_last = pd.concat([
+        first[['Matric_Number']].reset_index(drop=True),
+        first[list(first_columns)].rename(columns=first_columns).reset_index(drop=True),
+        last[list(last_columns)].rename(columns=last_columns).reset_index(drop=True),
+    ], axis=1)
+
+    # Classifying the GPA and CGPA
+    if boundaries is not None:
+        for column in ['First_GPA', 'First_CGPA', 'Last_GPA', 'Last_CGPA']:
+            first_and_last[column + '_Classification'] = classify_scores(first_and_last[column], boundaries)
+    return first_and_last[FIRST_AND_LAST_COLUMNS]
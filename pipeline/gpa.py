@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+
+from .classification import CLASS_BOUNDARIES, classify_scores
+
+# Results are totalled per student, session and semester
+SEMESTER_KEYS = ['Matric_Number', 'Session', 'Semester']
+
+# Columns of the Academic_Performance table
+ACADEMIC_PERFORMANCE_COLUMNS = ['Matric_Number', 'Session', 'Semester', 'GPA', 'CGPA',
+                                'GPA_Classification', 'CGPA_Classification']
+
+
+def _semester_codes(result_sheet):
+    # One integer per student, session and semester, ordered like the
+    # sorted keys; rows with a missing key get -1 and are left out, as
+    # groupby does
+    codes = np.zeros(len(result_sheet), dtype=np.int64)
+    missing = np.zeros(len(result_sheet), dtype=bool)
+    for key in SEMESTER_KEYS:
+        key_codes, uniques = pd.factorize(result_sheet[key], sort=True)
+        codes = codes * (len(uniques) + 1) + key_codes
+        missing |= key_codes < 0
+    codes[missing] = -1
+    return codes
+
+
+def semester_sums(result_sheet):
+    """Total points and course units of every student in every semester.
+
+    The results are reduced with one integer code per student, session and
+    semester, so no Python runs per group. The table is sorted by student,
+    session and semester. (Course units and grade points are whole
+    numbers, so the totals are exact whatever the order of the sum.)
+    """
+    codes = _semester_codes(result_sheet)
+    present = codes >= 0
+    semesters, first_rows, inverse = np.unique(codes[present], return_index=True, return_inverse=True)
+
+    # Missing points count as 0, as in a sum
+    points = np.nan_to_num(result_sheet['Points_Earned'].to_numpy(dtype=float, na_value=np.nan)[present])
+    units = np.nan_to_num(result_sheet['Course_Unit'].to_numpy(dtype=float, na_value=np.nan)[present])
+
+    # Keys of every semester, from its first row
+    rows = np.flatnonzero(present)[first_rows]
+    totals = result_sheet[SEMESTER_KEYS].iloc[rows].reset_index(drop=True)
+    totals['Total_Points_Earned'] = np.bincount(inverse, weights=points, minlength=len(semesters))
+    totals['Total_Course_Units'] = np.bincount(inverse, weights=units, minlength=len(semesters))
+    return totals
+
+
+def semester_gpa(totals):
+    """Add the GPA, cumulative totals and CGPA to sorted semester totals.
+
+    GPAs and CGPAs are rounded to 2dp, and a semester without course
+    units has a GPA of 0, as in the notebook.
+    """
+    totals = totals.copy()
+    total_points = totals['Total_Points_Earned'].to_numpy(dtype=float)
+    total_units = totals['Total_Course_Units'].to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        totals['GPA'] = np.where(total_units != 0, np.round(total_points / total_units, 2), 0.0)
+
+    # Running totals of every student over their semesters, in order
+    student_codes, _ = pd.factorize(totals['Matric_Number'])
+    cumulative = totals[['Total_Points_Earned', 'Total_Course_Units']].groupby(student_codes).cumsum()
+    totals['Cumulative_Points_Earned'] = cumulative['Total_Points_Earned']
+    totals['Cumulative_Course_Units'] = cumulative['Total_Course_Units']
+    totals['CGPA'] = np.round(totals['Cumulative_Points_Earned'] / totals['Cumulative_Course_Units'], 2)
+    return totals
+
+
+def semester_totals(result_sheet):
+    """Points, units, GPA and CGPA of every student in every semester.
+
+    Has the same values as grouping the results and summing each group,
+    sorted by student, session and semester.
+    """
+    return semester_gpa(semester_sums(result_sheet))
+
+
+def classify_semesters(totals, boundaries=CLASS_BOUNDARIES):
+    """The Academic_Performance table of semester totals with their GPA and CGPA."""
+    totals = totals.assign(GPA_Classification=classify_scores(totals['GPA'], boundaries),
+                           CGPA_Classification=classify_scores(totals['CGPA'], boundaries))
+    return totals[ACADEMIC_PERFORMANCE_COLUMNS]
+
+
+def gpa(result_sheet, boundaries=CLASS_BOUNDARIES):
+    """GPA stage: the GPA and CGPA of every student in every semester.
+
+    Returns the Academic_Performance table, with the GPA and CGPA
+    classified by `boundaries`.
+    """
+    return gpa_from_sums(semester_sums(result_sheet), boundaries)
+
+
+def gpa_from_sums(totals, boundaries=CLASS_BOUNDARIES):
+    """GPA stage for results already reduced to semester totals by semester_sums."""
+    return classify_semesters(semester_gpa(totals), boundaries)
@@ -0,0 +1,70 @@
+import logging
+
+import pandas as pd
+
+from .classification import CLASS_BOUNDARIES
+from .gpa import SEMESTER_KEYS, gpa
+from .first_last import first_last
+
+logger = logging.getLogger(__name__)
+
+# A student has one result per course in a semester
+RESULT_KEYS = [*SEMESTER_KEYS, 'Course_Code']
+
+
+def _replace_students(table, students, rows, keys):
+    # The rows of the given students are swapped for the new ones, and the
+    # table sorted as a full rebuild sorts it
+    kept = table[~table['Matric_Number'].isin(students)]
+    return pd.concat([kept, rows]).sort_values(by=keys, kind='stable').reset_index(drop=True)
+
+
+def _drop_ingested(result_sheet, new_results):
+    # Results already in Result_sheet (a batch ingested twice) or repeated
+    # in the batch would be counted again in the GPAs, so they are dropped
+    keys = pd.MultiIndex.from_frame(new_results[RESULT_KEYS])
+    ingested = keys.duplicated() | keys.isin(pd.MultiIndex.from_frame(result_sheet[RESULT_KEYS]))
+    if ingested.any():
+        logger.warning("Skipping %d results already ingested", ingested.sum())
+    return new_results[~ingested]
+
+
+def ingest(tables, new_results, boundaries=CLASS_BOUNDARIES, start=None):
+    """Ingest stage: add a batch of cleaned and enriched results to the tables.
+
+    `tables` are the Student_Data tables keyed by sheet name and
+    `new_results` the Result_sheet rows of the batch. The rows are appended
+    to Result_sheet, less those already in it for the same student, session,
+    semester and course, and the Academic_Performance and First_and_Last_Result
+    rows of only the students in the batch are recomputed from their full
+    results. Returns the updated tables.
+
+    The tables may hold only the rows of the students in the batch, as
+    read_students reads them; the new results are then numbered on from
+    `start` rather than from the stored rows.
+    """
+    result_sheet = tables['Result_sheet']
+    new_results = _drop_ingested(result_sheet, new_results)
+    if new_results.empty:
+        return tables
+
+    # New rows are numbered on from the stored ones
+    if start is None:
+        start = result_sheet.index.max() + 1 if len(result_sheet) else 0
+    new_results = new_results.set_axis(pd.RangeIndex(start, start + len(new_results)))
+    result_sheet = pd.concat([result_sheet, new_results])
+
+    # Only the students with new results need their GPA, CGPA and first and
+    # last semester recomputed
+    students = new_results['Matric_Number'].dropna().unique()
+    academic_performance = gpa(result_sheet[result_sheet['Matric_Number'].isin(students)], boundaries)
+    first_and_last = first_last(academic_performance, boundaries)
+
+    return {
+        **tables,
+        'Result_sheet': result_sheet,
+        'Academic_Performance': _replace_students(tables['Academic_Performance'], students,
+                                                  academic_performance, SEMESTER_KEYS),
+        'First_and_Last_Result': _replace_students(tables['First_and_Last_Result'], students,
+                                                   first_and_last, ['Matric_Number']),
+    }
@@ -0,0 +1,59 @@
+# Lookup tables used to clean and enrich the raw student records
+
+# Year of study to Level
+year_to_level = {1: 100, 2: 200, 3: 300, 4: 400, 5: 500, 6: 600}
+
+# Values used to fill missing Biodata entries
+biodata_fill_values = {
+    'Marital_Status': 'Single',
+    'Religion': '-',
+    'State_of_Origin': '-',
+    'Nationality': 'Nigerian',
+}
+
+# Mapping dictionaries of the misspelt Biodata entries
+gender_mapping = {
+    'Female': 'Female', 'female': 'Female', 'FEMALE': 'Female', 'Femal': 'Female',
+    'Male': 'Male', 'MALE': 'Male'
+}
+
+marital_status_mapping = {
+    'Single': 'Single', 'Married': 'Married', 'Maried': 'Married', 'Male': 'Single'
+}
+
+religion_mapping = {
+    'Christian': 'Christian', 'Christain': 'Christian', 'Cristian': 'Christian', 'Chritsian': 'Christian',
+    'CHRISTIAN': 'Christian', 'Christan': 'Christian', 'muslim': 'Muslim', 'Islam': 'Muslim',
+    'Muslim': 'Muslim', 'Muslum': 'Muslim', 'ISLAM': 'Muslim', 'Isam': 'Muslim',
+    'Eckankar': 'Eckankar', '-': 'Unknown', 'Kano': 'Unknown', 'Douala': 'Unknown',
+    'Ndukwe East': 'Unknown', 'Malabo': 'Unknown'
+}
+
+state_mapping = {
+    'Osun': 'Osun', 'OSUN': 'Osun', 'lagos': 'Lagos', 'LAGOS': 'Lagos', 'Lagos': 'Lagos',
+    'Ondo': 'Ondo', 'ONDO': 'Ondo', 'Ondoi': 'Ondo', 'Edo': 'Edo', 'Ogun': 'Ogun', 'OGUN': 'Ogun',
+    'Ekiti': 'Ekiti', 'EKITI': 'Ekiti', 'Anambra': 'Anambra', 'Rivers': 'Rivers', 'RIVER': 'Rivers',
+    'Imo': 'Imo', 'IMO': 'Imo', 'Cross-River': 'Cross River', 'Cross River': 'Cross River',
+    'C/River': 'Cross River', 'Kogi': 'Kogi', 'kogi': 'Kogi', 'KOGI': 'Kogi', 'Oyo': 'Oyo', 'OYO': 'Oyo',
+    'Abia': 'Abia', 'Delta': 'Delta', 'Ebonyi': 'Ebonyi', 'EBONYI': 'Ebonyi', 'Kwara': 'Kwara', 'KWARA': 'Kwara',
+    'Niger': 'Niger', 'NIGER': 'Niger', 'Akwa Ibom': 'Akwa Ibom', 'Awa Ibom': 'Akwa Ibom',
+    'Akwa-Ibom': 'Akwa Ibom', 'Kebbi': 'Kebbi', 'Ijebu-Ode': 'Ogun', 'Enugu': 'Enugu',
+    'Bayelsa': 'Bayelsa', 'BAYELSA': 'Bayelsa', 'Borno': 'Borno', 'Bornu': 'Borno', 'Taraba': 'Taraba',
+    'Benue': 'Benue', 'Gombe': 'Gombe', 'Adamawa': 'Adamawa', 'Kano': 'Kano', 'Nassarawa': 'Nasarawa',
+    'Plateau': 'Plateau', 'Douala': 'Douala', 'Ndukwe East': 'Delta', 'Ikorodu': 'Lagos', 'Malabo': 'Malabo'
+}
+
+# Mappings applied to each Biodata column
+biodata_mappings = {
+    'Sex': gender_mapping,
+    'Marital_Status': marital_status_mapping,
+    'Religion': religion_mapping,
+    'State_of_Origin': state_mapping,
+}
+
+# General studies courses, which do not count towards the GPA
+gst_course_codes = ['GST102', 'GST103', 'GST104', 'GST105', 'GST106',
+                    'GST113', 'GST114', 'GST201', 'GST202', 'GST204', 'GST214', 'GST307', 'GST308']
+
+# Points of each grade
+grade_points_dict = {'A': 5.0, 'B': 4.0, 'C': 3.0, 'D': 2.0, 'E': 1.0, 'F': 0.0}
@@ -0,0 +1,67 @@
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+
+from .classification import CLASS_BOUNDARIES
+from .gpa import SEMESTER_KEYS, gpa
+from .first_last import first_last
+
+logger = logging.getLogger(__name__)
+
+# Below this many result rows the vectorised GPA and first/last stages take
+# about a tenth of a second, less than starting a pool of Python processes
+# (each importing pandas) and pickling every partition to them and back; a
+# row count, where the web app's workbook reader goes by file size
+PARALLEL_THRESHOLD = 200_000  # rows
+
+
+def partition_students(result_sheet, partitions):
+    """Split the results into `partitions` frames by a hash of the Matric_Number.
+
+    Every student's results land in the same partition, and the hash does
+    not depend on the process, so the split is the same on every run.
+    """
+    hashes = pd.util.hash_array(result_sheet['Matric_Number'].to_numpy(dtype=object))
+    partition = (hashes % np.uint64(partitions)).astype(np.int64)
+    return [result_sheet[partition == number] for number in range(partitions)]
+
+
+def student_stages(result_sheet, boundaries=CLASS_BOUNDARIES):
+    """Run the GPA and first/last stages on the results of a set of students."""
+    academic_performance = gpa(result_sheet, boundaries)
+    return academic_performance, first_last(academic_performance, boundaries)
+
+
+def _combine(outputs):
+    # The partitions come back in partition order and are sorted the way
+    # the serial stages sort them, so the tables do not depend on the split
+    academic_performance = pd.concat([output[0] for output in outputs])
+    first_and_last = pd.concat([output[1] for output in outputs])
+    return (academic_performance.sort_values(by=SEMESTER_KEYS, kind='stable').reset_index(drop=True),
+            first_and_last.sort_values(by='Matric_Number', kind='stable').reset_index(drop=True))
+
+
+def parallel_student_stages(result_sheet, workers=None, boundaries=CLASS_BOUNDARIES,
+                            parallel_threshold=PARALLEL_THRESHOLD):
+    """GPA and first/last stages with the students spread over worker processes.
+
+    The students are hash-partitioned into one partition per worker and
+    each worker runs student_stages on its own. Small inputs, or a single
+    worker, run serially. Returns the Academic_Performance and
+    First_and_Last_Result tables, the same as the serial stages.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers > 1 and len(result_sheet) >= parallel_threshold:
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(student_stages, partition, boundaries)
+                           for partition in partition_students(result_sheet, workers)]
+                return _combine([future.result() for future in futures])
+        except (OSError, BrokenProcessPool):
+            logger.warning("Parallel GPA stages failed, running them serially", exc_info=True)
+    return student_stages(result_sheet, boundaries)
@@ -0,0 +1,279 @@
+import json
+import os
+import shutil
+import uuid
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from .gpa import SEMESTER_KEYS
+from .write import OUTPUT_SHEETS
+
+# Tables written as datasets partitioned by Session, one directory per
+# session; the others are written as a single file
+PARTITIONED_TABLES = ['Result_sheet', 'Academic_Performance']
+PARTITION_COLUMN = 'Session'
+
+# Tables an ingest reads and writes back, for the students of its batch only
+INGESTED_TABLES = ['Result_sheet', 'Academic_Performance', 'First_and_Last_Result']
+
+# Extension of the Parquet files and of a Student_Data dataset directory
+PARQUET_EXTENSION = '.parquet'
+
+# Session directories are read back as plain strings, '__HIVE_DEFAULT_PARTITION__'
+# (a missing session) as missing
+_session_partitioning = ds.partitioning(pa.schema([(PARTITION_COLUMN, pa.string())]), flavor='hive')
+
+
+def table_path(path, table_name):
+    """Location of a table in a dataset: a directory if partitioned, else a file."""
+    if table_name in PARTITIONED_TABLES:
+        return os.path.join(path, table_name)
+    return os.path.join(path, table_name + PARQUET_EXTENSION)
+
+
+def arrow_safe(df):
+    """Copy of a dataframe with a single Arrow type per column.
+
+    Object columns, which may mix numbers and strings (e.g. Level holding
+    100 and '-'), are turned into strings whatever their values, so every
+    chunk of a table gets the same types.
+    """
+    df = df.copy()
+    for column in df.columns[df.dtypes == object]:
+        df[column] = df[column].where(df[column].isna(), df[column].astype(str))
+    return df
+
+
+def _arrow_table(df, schema=None):
+    table = pa.Table.from_pandas(arrow_safe(df), preserve_index=True)
+    # Later chunks of a table take the types of the first one
+    return table if schema is None else table.cast(schema)
+
+
+def _write_options(table):
+    # Strings are dictionary-encoded and every column gets min/max statistics,
+    # so readers can skip row groups and sessions they do not need
+    strings = [field.name for field in table.schema
+               if pa.types.is_string(field.type) or pa.types.is_large_string(field.type)
+               or pa.types.is_dictionary(field.type)]
+    return {'use_dictionary': strings, 'write_statistics': True}
+
+
+def _write_table(chunks, path, table_name):
+    if isinstance(chunks, pd.DataFrame):
+        chunks = [chunks]
+
+    schema, writer = None, None
+    try:
+        for number, chunk in enumerate(chunks):
+            table = _arrow_table(chunk, schema)
+            schema = table.schema
+            if table_name in PARTITIONED_TABLES:
+                pq.write_to_dataset(table, table_path(path, table_name), partition_cols=[PARTITION_COLUMN],
+                                    basename_template=f'part-{number:05d}-{{i}}{PARQUET_EXTENSION}',
+                                    **_write_options(table))
+            else:
+                if writer is None:
+                    writer = pq.ParquetWriter(table_path(path, table_name), schema, **_write_options(table))
+                writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def write_parquet(tables, path):
+    """Write the tables as a Parquet dataset: a directory with one entry per table.
+
+    Result_sheet and Academic_Performance are partitioned by Session; each
+    table keeps its index, so it reads back in its original row order.
+    A table may be a dataframe or an iterable of dataframe chunks. The
+    dataset is written next to `path` and then moved into place, so a
+    reader never sees half of it.
+    """
+    path = os.path.abspath(path)
+    staging_path, old_path = path + '.staging', path + '.old'
+    shutil.rmtree(staging_path, ignore_errors=True)
+    os.makedirs(staging_path)
+    try:
+        for table_name in OUTPUT_SHEETS:
+            _write_table(tables[table_name], staging_path, table_name)
+    except BaseException:
+        shutil.rmtree(staging_path, ignore_errors=True)
+        raise
+
+    if os.path.exists(path):
+        shutil.rmtree(old_path, ignore_errors=True)
+        os.replace(path, old_path)
+    os.replace(staging_path, path)
+    shutil.rmtree(old_path, ignore_errors=True)
+    return path
+
+
+def _read_table(location, **options):
+    # Session directories are read back with their partition column
+    if os.path.isdir(location):
+        return pq.read_table(location, partitioning=_session_partitioning, **options)
+    return pq.read_table(location, **options)
+
+
+def _stored_schema(location):
+    # Types of the columns of a table as written, the partition column included
+    if os.path.isdir(location):
+        return ds.dataset(location, format='parquet', partitioning=_session_partitioning).schema
+    return pq.read_schema(location)
+
+
+def read_parquet_table(path, table_name, filters=None):
+    """Read one table of a Parquet dataset back into a dataframe, rows in their original order.
+
+    `filters` (in pyarrow's form) selects the rows to read, skipping the
+    sessions and row groups without any.
+    """
+    table = _read_table(table_path(path, table_name), filters=filters)
+    df = table.to_pandas().sort_index(kind='stable')
+
+    # The partition column comes back last; restoring the written order
+    columns = [column['name'] for column in json.loads(table.schema.metadata[b'pandas'])['columns']
+               if column['name'] in df.columns]
+    return df[columns]
+
+
+def read_parquet(path, table_names=OUTPUT_SHEETS, filters=None):
+    """Read the tables of a Parquet dataset, keyed by name."""
+    return {table_name: read_parquet_table(path, table_name, filters) for table_name in table_names}
+
+
+def read_students(path, students):
+    """Read the rows of the given students from the tables an ingest changes."""
+    return read_parquet(path, INGESTED_TABLES, [('Matric_Number', 'in', list(students))])
+
+
+def table_index_end(path, table_name):
+    """One past the largest row index of a table, read from its index column alone."""
+    location = table_path(path, table_name)
+    index_column = json.loads(_stored_schema(location).metadata[b'pandas'])['index_columns'][0]
+    index = _read_table(location, columns=[index_column]).column(0)
+    return pc.max(index).as_py() + 1 if len(index) else 0
+
+
+def _stored_arrow_table(df, location):
+    # New rows take the types the table was written with
+    table = _arrow_table(df)
+    schema = _stored_schema(location)
+    fields = [schema.field(field.name) if field.name in schema.names else field for field in table.schema]
+    return table.cast(pa.schema(fields, metadata=table.schema.metadata))
+
+
+def _move_into(staging_path, location, replace):
+    # Moves what was written to the staging directory into the table: each
+    # new file, or each session directory in place of the stored one
+    for name in os.listdir(staging_path):
+        source, target = os.path.join(staging_path, name), os.path.join(location, name)
+        if replace or not os.path.isdir(source):
+            if os.path.isdir(target):
+                old_path = os.path.join(staging_path, '.old')
+                os.replace(target, old_path)
+                os.replace(source, target)
+                shutil.rmtree(old_path)
+            else:
+                os.replace(source, target)
+        else:
+            os.makedirs(target, exist_ok=True)
+            _move_into(source, target, replace)
+
+
+def write_partitions(df, path, table_name, replace=False):
+    """Write rows to a partitioned table of a Parquet dataset in place.
+
+    The rows are added as new files in their session directories, the
+    files already there left alone; with `replace`, the directories of the
+    sessions in `df` are replaced by its rows instead. The files are written
+    aside first, so a reader never sees half of one.
+    """
+    location = table_path(path, table_name)
+    staging_path = os.path.abspath(path) + '.staging'
+    shutil.rmtree(staging_path, ignore_errors=True)
+    try:
+        table = _stored_arrow_table(df, location)
+        pq.write_to_dataset(table, staging_path, partition_cols=[PARTITION_COLUMN],
+                            basename_template=f'part-{uuid.uuid4().hex}-{{i}}{PARQUET_EXTENSION}',
+                            **_write_options(table))
+        _move_into(staging_path, location, replace)
+    finally:
+        shutil.rmtree(staging_path, ignore_errors=True)
+
+
+def write_file(df, path, table_name):
+    """Write a table of a Parquet dataset stored as a single file in place of the stored one."""
+    location = table_path(path, table_name)
+    staging_path = location + '.staging'
+    table = _stored_arrow_table(df, location)
+    try:
+        pq.write_table(table, staging_path, **_write_options(table))
+        os.replace(staging_path, location)
+    finally:
+        if os.path.exists(staging_path):
+            os.remove(staging_path)
+
+
+def _keep_index(stored, rows, keys, end):
+    # Rows already stored keep their index, so they read back where they
+    # were; rows not stored before are numbered on from `end`
+    index = rows[keys].merge(stored[keys].reset_index(), how='left', on=keys)['index']
+    new = index.isna().to_numpy()
+    index[new] = range(end, end + new.sum())
+    return rows.set_axis(pd.Index(index.astype('int64'), name=stored.index.name))
+
+
+def _same(rows, stored, column):
+    # Whether each row has the value stored at its index, missing matching missing
+    old = stored[column].reindex(rows.index)
+    return ((rows[column] == old) | (rows[column].isna() & old.isna())).to_numpy()
+
+
+def write_ingested(stored, tables, path):
+    """Write the changes of an ingest to a Parquet dataset in place.
+
+    `stored` are the tables an ingest changes as read_students read them,
+    and `tables` the same tables after the ingest stage. The new results are
+    added to their session directories; of Academic_Performance only the
+    session directories where the GPA or CGPA of a semester changed are
+    rewritten, and First_and_Last_Result (one row per student) is rewritten
+    whole. Rows already stored keep their index and new ones are numbered
+    on, so they read back after the others.
+    """
+    # The new results are the rows that were not read from the dataset
+    result_sheet = tables['Result_sheet']
+    new_results = result_sheet[~result_sheet.index.isin(stored['Result_sheet'].index)]
+    if new_results.empty:
+        return path
+    write_partitions(new_results, path, 'Result_sheet')
+
+    # The semesters of the students whose GPA or CGPA changed, or that are new
+    academic_performance = _keep_index(stored['Academic_Performance'], tables['Academic_Performance'],
+                                       SEMESTER_KEYS, table_index_end(path, 'Academic_Performance'))
+    changed = ~(_same(academic_performance, stored['Academic_Performance'], 'GPA')
+                & _same(academic_performance, stored['Academic_Performance'], 'CGPA'))
+    sessions = academic_performance.loc[changed, PARTITION_COLUMN].dropna().unique().tolist()
+    if sessions:
+        partitions = read_parquet_table(path, 'Academic_Performance', [(PARTITION_COLUMN, 'in', sessions)])
+        students = academic_performance['Matric_Number'].unique()
+        partitions = pd.concat([
+            partitions[~partitions['Matric_Number'].isin(students)],
+            academic_performance[academic_performance[PARTITION_COLUMN].isin(sessions)],
+        ]).sort_index(kind='stable')
+        write_partitions(partitions, path, 'Academic_Performance', replace=True)
+
+    first_and_last = read_parquet_table(path, 'First_and_Last_Result')
+    new_first_and_last = _keep_index(stored['First_and_Last_Result'], tables['First_and_Last_Result'],
+                                     ['Matric_Number'], table_index_end(path, 'First_and_Last_Result'))
+    first_and_last = pd.concat([
+        first_and_last[~first_and_last['Matric_Number'].isin(new_first_and_last['Matric_Number'])],
+        new_first_and_last,
+    ]).sort_index(kind='stable')
+    write_file(first_and_last, path, 'First_and_Last_Result')
+    return path
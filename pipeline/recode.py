@@ -0,0 +1,91 @@
+import difflib
+import logging
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# How close an unseen value must be to a known spelling for its mapping
+# to be suggested (difflib similarity ratio, 0-1)
+SUGGESTION_CUTOFF = 0.85
+
+
+def remap_codes(codes, unique_codes):
+    """Broadcast a new code for each distinct value back to every entry.
+
+    `codes` are those pd.factorize gives the entries and `unique_codes`
+    the new code of each of the distinct values. The -1 appended at the
+    end keeps missing entries (code -1) missing.
+    """
+    return np.append(unique_codes, -1)[codes]
+
+
+def recoded_categorical(codes, recoded, categories=None, ordered=False):
+    """Categorical of factorised entries, each distinct value replaced by its `recoded` value.
+
+    The recoded values are factorised in turn to get the categories, or
+    looked up in `categories` when given, so only the distinct values are
+    handled in Python.
+    """
+    if categories is None:
+        unique_codes, categories = pd.factorize(recoded)
+    else:
+        unique_codes = pd.Index(categories).get_indexer(recoded)
+    return pd.Categorical.from_codes(remap_codes(codes, unique_codes), categories, ordered=ordered)
+
+
+@lru_cache(maxsize=4096)
+def _closest(value, known, cutoff):
+    # Case-insensitive best match among the known spellings, cached as the
+    # same typos come back batch after batch
+    folded = {spelling.casefold(): spelling for spelling in known}
+    matches = difflib.get_close_matches(value.casefold(), list(folded), n=1, cutoff=cutoff)
+    return folded[matches[0]] if matches else None
+
+
+def suggest_mapping(values, mapping, cutoff=SUGGESTION_CUTOFF):
+    """Propose mappings for the values that `mapping` does not cover.
+
+    Each unseen string is matched against the spellings the mapping knows
+    (its keys and their targets) and given the target of the closest one,
+    if it is similar enough. Returns {unseen value: suggested value}.
+    """
+    targets = {**{value: value for value in mapping.values()}, **mapping}
+    known = tuple(sorted(spelling for spelling in targets if isinstance(spelling, str)))
+
+    suggestions = {}
+    for value in values:
+        if isinstance(value, str) and value not in targets:
+            closest = _closest(value, known, cutoff)
+            if closest is not None:
+                suggestions[value] = targets[closest]
+    return suggestions
+
+
+def recode(column, mapping, fill_value=None, suggest=False, cutoff=SUGGESTION_CUTOFF):
+    """Recode a column through `mapping`, working on its distinct values only.
+
+    The column is factorised once; the mapping (and `fill_value`, which
+    stands in for missing entries before they are mapped) is applied to
+    the distinct values and broadcast back through the codes. Values the
+    mapping does not know are kept; with `suggest`, those close to a known
+    spelling get its mapping instead, which is logged (suggest_mapping
+    proposes the same corrections without applying them). Returns a
+    categorical Series with the same index.
+    """
+    codes, uniques = pd.factorize(column)
+    uniques = list(uniques)
+    if fill_value is not None:
+        # Missing entries get a code of their own, after the distinct values
+        codes = np.where(codes < 0, len(uniques), codes)
+        uniques.append(fill_value)
+
+    suggestions = suggest_mapping(uniques, mapping, cutoff) if suggest else {}
+    for value, target in suggestions.items():
+        logger.warning("%s: recoding unseen value %r as %r", column.name, value, target)
+    recoded = [mapping.get(value, suggestions.get(value, value)) for value in uniques]
+
+    categorical = recoded_categorical(codes, pd.Index(recoded, dtype=object))
+    return pd.Series(categorical, index=column.index, name=column.name)
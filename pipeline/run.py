@@ -0,0 +1,177 @@
+import logging
+import os
+import tempfile
+import time
+from collections import namedtuple
+
+import pandas as pd
+
+from .classification import CLASS_BOUNDARIES
+from .clean import clean, clean_registration, clean_biodata, clean_result
+from .enrich import enrich
+from .gpa import gpa, gpa_from_sums
+from .first_last import first_last
+from .ingest import ingest
+from .parallel import parallel_student_stages
+from .stream import CHUNK_SIZE, iter_chunks, stream_results, iter_spilled
+from .parquet import (PARQUET_EXTENSION, write_parquet, read_parquet, read_students, table_index_end,
+                      write_ingested)
+from .write import OUTPUT_SHEETS, write, write_streaming
+
+logger = logging.getLogger(__name__)
+
+# Run time of one stage and the number of rows it produced
+StageReport = namedtuple('StageReport', ['stage', 'rows', 'seconds'])
+
+
+def read_records(path, sheet_names=None):
+    """Read the sheets of the raw student records workbook (StudentRec_.xlsx), all by default."""
+    return pd.read_excel(path, sheet_name=sheet_names)
+
+
+def is_parquet(path):
+    """Whether a Student_Data path is a Parquet dataset rather than a workbook."""
+    return path.lower().endswith(PARQUET_EXTENSION) or os.path.isdir(path)
+
+
+def read_dataset(path):
+    """Read the tables of a Student_Data workbook or Parquet dataset written by the pipeline."""
+    if is_parquet(path):
+        return read_parquet(path)
+    return pd.read_excel(path, sheet_name=OUTPUT_SHEETS, index_col=0)
+
+
+def write_dataset(tables, path):
+    """Write stage: a Parquet dataset if `path` ends in .parquet, else a workbook."""
+    if is_parquet(path):
+        return write_parquet(tables, path)
+    return write(tables, path)
+
+
+def read_results(path):
+    """Read a batch of raw Result rows, from a CSV file or the first sheet of a workbook."""
+    if path.lower().endswith('.csv'):
+        return pd.read_csv(path)
+    return pd.read_excel(path, sheet_name=0)
+
+
+def _rows(output):
+    # Stages return a dataframe, a dict or tuple holding dataframes, or
+    # (for write) a path
+    if isinstance(output, pd.DataFrame):
+        return len(output)
+    if isinstance(output, dict):
+        return sum(_rows(item) for item in output.values())
+    if isinstance(output, tuple):
+        return sum(_rows(item) for item in output)
+    return 0
+
+
+def run_stage(reports, stage, function, *args):
+    """Run one stage, recording its run time and output size in `reports`."""
+    start = time.perf_counter()
+    output = function(*args)
+    report = StageReport(stage, _rows(output), time.perf_counter() - start)
+    reports.append(report)
+    logger.info("Stage %s: %d rows in %.2fs", report.stage, report.rows, report.seconds)
+    return output
+
+
+def run_pipeline(input_path, output_path=None, boundaries=CLASS_BOUNDARIES, workers=1, mappings=None):
+    """Build the Student_Data tables from the raw records at `input_path`.
+
+    GPAs and CGPAs are classified by the (class, lower bound) pairs of
+    `boundaries`. With several `workers` (None for one per core), the GPA
+    and first/last stages run in that many processes, each on a share of
+    the students. `mappings` adds Biodata corrections (see clean_biodata).
+    The tables are written to `output_path` when one is given. Returns the
+    tables keyed by sheet name and a StageReport per stage.
+    """
+    reports = []
+    sheets = run_stage(reports, 'read', read_records, input_path)
+    cleaned = run_stage(reports, 'clean', clean, sheets, mappings)
+    result_sheet = run_stage(reports, 'enrich', enrich, cleaned['Result'], sheets['Courses'], sheets['Sheet1'])
+    if workers == 1:
+        academic_performance = run_stage(reports, 'gpa', gpa, result_sheet, boundaries)
+        first_and_last = run_stage(reports, 'first_last', first_last, academic_performance, boundaries)
+    else:
+        academic_performance, first_and_last = run_stage(reports, 'gpa_first_last', parallel_student_stages,
+                                                         result_sheet, workers, boundaries)
+
+    tables = {
+        'Registration': cleaned['Registration'],
+        'Biodata': cleaned['Biodata'],
+        'Result_sheet': result_sheet,
+        'Academic_Performance': academic_performance,
+        'First_and_Last_Result': first_and_last,
+    }
+    if output_path is not None:
+        run_stage(reports, 'write', write_dataset, tables, output_path)
+    return tables, reports
+
+
+def run_ingest(records_path, results_path, dataset_path, output_path=None, boundaries=CLASS_BOUNDARIES):
+    """Add a batch of raw Result rows to the Student_Data workbook at `dataset_path`.
+
+    The batch is cleaned and enriched with the course lists of the records
+    workbook at `records_path`, and only its students are recomputed. The
+    tables are written back to `output_path` (the dataset itself by default).
+    A Parquet dataset written back to itself is only read for the students
+    of the batch and only the parts that changed are written (see
+    write_ingested); the tables returned then hold only those students.
+    Returns the tables keyed by sheet name and a StageReport per stage.
+    """
+    reports = []
+    sheets = run_stage(reports, 'read_courses', read_records, records_path, ['Courses', 'Sheet1'])
+    results = run_stage(reports, 'read_results', read_results, results_path)
+    results = run_stage(reports, 'clean', clean_result, results)
+    new_results = run_stage(reports, 'enrich', enrich, results, sheets['Courses'], sheets['Sheet1'])
+
+    output_path = output_path or dataset_path
+    if is_parquet(dataset_path) and os.path.abspath(output_path) == os.path.abspath(dataset_path):
+        students = new_results['Matric_Number'].dropna().unique()
+        stored = run_stage(reports, 'read_dataset', read_students, dataset_path, students)
+        start = table_index_end(dataset_path, 'Result_sheet')
+        tables = run_stage(reports, 'ingest', ingest, stored, new_results, boundaries, start)
+        run_stage(reports, 'write', write_ingested, stored, tables, dataset_path)
+        return tables, reports
+
+    tables = run_stage(reports, 'read_dataset', read_dataset, dataset_path)
+    tables = run_stage(reports, 'ingest', ingest, tables, new_results, boundaries)
+    run_stage(reports, 'write', write_dataset, tables, output_path)
+    return tables, reports
+
+
+def run_streaming(input_path, output_path, chunk_size=CHUNK_SIZE, boundaries=CLASS_BOUNDARIES, spill_dir=None,
+                  mappings=None):
+    """Build the Student_Data workbook with the Result sheet processed in chunks.
+
+    Like run_pipeline, but the raw results are streamed `chunk_size` rows at
+    a time through clean and enrich, their rows spilled to a temporary
+    directory (in `spill_dir` if given) and only the semester totals kept
+    in memory. Memory use is bounded by the chunk size and the number of
+    student-semesters, not by the number of results. Returns the tables
+    other than Result_sheet and a StageReport per stage.
+    """
+    reports = []
+    sheets = run_stage(reports, 'read', read_records, input_path, ['Registration', 'Biodata', 'Courses', 'Sheet1'])
+    registration = run_stage(reports, 'clean_registration', clean_registration, sheets['Registration'])
+    biodata = run_stage(reports, 'clean_biodata', clean_biodata, sheets['Biodata'], mappings)
+
+    with tempfile.TemporaryDirectory(prefix='pipeline-', dir=spill_dir) as spill_path:
+        chunks = iter_chunks(input_path, 'Result', chunk_size)
+        spilled, totals = run_stage(reports, 'stream', stream_results, chunks,
+                                    sheets['Courses'], sheets['Sheet1'], spill_path)
+        academic_performance = run_stage(reports, 'gpa', gpa_from_sums, totals, boundaries)
+        first_and_last = run_stage(reports, 'first_last', first_last, academic_performance, boundaries)
+
+        tables = {
+            'Registration': registration,
+            'Biodata': biodata,
+            'Academic_Performance': academic_performance,
+            'First_and_Last_Result': first_and_last,
+        }
+        # Both writers take the spilled Result_sheet a chunk at a time
+        writer = write_parquet if is_parquet(output_path) else write_streaming
+        run_stage(reports, 'write', writer, {**tables, 'Result_sheet': iter_spilled(spilled)}, output_path)
+    return tables, reports
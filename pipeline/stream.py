@@ -0,0 +1,85 @@
+import os
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from .clean import clean_result
+from .enrich import enrich
+from .gpa import SEMESTER_KEYS, semester_sums
+
+# Raw Result rows processed at a time
+CHUNK_SIZE = 100_000
+
+# Columns of the running semester totals
+TOTAL_COLUMNS = ['Total_Points_Earned', 'Total_Course_Units']
+
+
+def iter_chunks(path, sheet_name, chunk_size=CHUNK_SIZE):
+    """Yield the rows of a sheet (or a CSV file) as dataframes of `chunk_size` rows.
+
+    The workbook is read in openpyxl's read-only mode, which streams the
+    rows, so only one chunk is in memory at a time. Each chunk is indexed
+    by its row numbers in the sheet, as read_excel would index it.
+    """
+    if path.lower().endswith('.csv'):
+        yield from pd.read_csv(path, chunksize=chunk_size)
+        return
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook[sheet_name].iter_rows(values_only=True)
+        header = list(next(rows))
+        start, chunk = 0, []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                yield pd.DataFrame.from_records(chunk, columns=header, coerce_float=True,
+                                                index=pd.RangeIndex(start, start + len(chunk)))
+                start, chunk = start + len(chunk), []
+        if chunk:
+            yield pd.DataFrame.from_records(chunk, columns=header, coerce_float=True,
+                                            index=pd.RangeIndex(start, start + len(chunk)))
+    finally:
+        workbook.close()
+
+
+def _compact(totals):
+    # Semesters split across chunks have several partial totals; summing
+    # them leaves one row per semester
+    return pd.concat(totals).groupby(SEMESTER_KEYS, sort=False)[TOTAL_COLUMNS].sum().reset_index()
+
+
+def stream_results(chunks, courses, lecturers, spill_dir):
+    """Clean, enrich and total raw Result chunks, spilling the rows to disk.
+
+    Every chunk goes through clean_result and enrich. Its Result_sheet rows
+    are written to a file in `spill_dir` and its semester totals added to
+    the running totals, which are all that stays in memory. Returns the
+    paths of the spilled chunks and the semester totals, sorted by
+    student, session and semester.
+    """
+    spilled, totals, pending = [], None, []
+    for number, chunk in enumerate(chunks):
+        result_sheet = enrich(clean_result(chunk), courses, lecturers)
+        path = os.path.join(spill_dir, f'result_sheet-{number:06d}.pkl')
+        result_sheet.to_pickle(path)
+        spilled.append(path)
+
+        # The partial totals are merged once they outgrow the running ones,
+        # so merging costs stay linear in the number of semesters
+        pending.append(semester_sums(result_sheet))
+        if totals is None or sum(len(part) for part in pending) > len(totals):
+            totals = _compact(pending if totals is None else [totals, *pending])
+            pending = []
+
+    if totals is None:
+        return spilled, pd.DataFrame(columns=SEMESTER_KEYS + TOTAL_COLUMNS)
+    if pending:
+        totals = _compact([totals, *pending])
+    return spilled, totals.sort_values(by=SEMESTER_KEYS, kind='stable').reset_index(drop=True)
+
+
+def iter_spilled(paths):
+    """Read back spilled chunks one at a time."""
+    for path in paths:
+        yield pd.read_pickle(path)
@@ -0,0 +1,52 @@
+import pandas as pd
+
+# Sheets of the Student_Data workbook, in the order they are written (the
+# web app derives First_and_Last_Result itself; the Power BI report reads it)
+OUTPUT_SHEETS = ['Registration', 'Biodata', 'Result_sheet', 'Academic_Performance', 'First_and_Last_Result']
+
+
+def write(tables, path):
+    """Write stage: save the tables as the sheets of the Student_Data workbook."""
+    with pd.ExcelWriter(path, engine="xlsxwriter") as writer:
+        for sheet_name in OUTPUT_SHEETS:
+            tables[sheet_name].to_excel(writer, sheet_name=sheet_name)
+    return path
+
+
+def _write_rows(worksheet, df, first_row):
+    # Index first, as to_excel writes it; missing values become blank cells
+    values = df.astype(object).where(df.notna(), None)
+    for offset, row in enumerate(values.itertuples(name=None)):
+        worksheet.write_row(first_row + offset, 0, row)
+    return first_row + len(df)
+
+
+def write_streaming(tables, path):
+    """Write the Student_Data workbook a row at a time, in constant memory.
+
+    Each table is a dataframe or an iterable of dataframe chunks, so a
+    table spilled to disk never has to be loaded whole. The sheets have
+    the same layout as those of write(), without its header formatting.
+    """
+    # Imported here, so the stages and the Parquet writer and reader (which
+    # the web app imports) do not need xlsxwriter
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(path, {'constant_memory': True})
+    try:
+        for sheet_name in OUTPUT_SHEETS:
+            worksheet = workbook.add_worksheet(sheet_name)
+            chunks = tables[sheet_name]
+            if isinstance(chunks, pd.DataFrame):
+                chunks = [chunks]
+
+            row = None
+            for chunk in chunks:
+                if row is None:
+                    # Header row, with the blank cell over the index
+                    worksheet.write_row(0, 0, ['', *chunk.columns])
+                    row = 1
+                row = _write_rows(worksheet, chunk, row)
+    finally:
+        workbook.close()
+    return path
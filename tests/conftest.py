@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The pipeline package sits at the root of the repository, next to tests
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,74 @@
+"""The notebook's apply-based GPA, classification and first/last code.
+
+Kept as it was moved into the pipeline (before the stages were
+vectorised), as the reference the pipeline's stages are tested against.
+"""
+import pandas as pd
+
+
+def classify(score):
+    """Degree classification of a GPA or CGPA."""
+    if 4.50 <= score <= 5.00:
+        return 'First Class'
+    elif 3.50 <= score <= 4.49:
+        return 'Second Class Upper'
+    elif 2.40 <= score <= 3.49:
+        return 'Second Class Lower'
+    elif 1.50 <= score <= 2.39:
+        return 'Third Class'
+    elif 1.00 <= score <= 1.49:
+        return 'Pass'
+    else:
+        return 'Fail'
+
+
+def calculate_gpa(x):
+    """Totals and GPA of the results of one student in one semester."""
+    total_points_earned = x['Points_Earned'].sum()
+    total_course_units = x['Course_Unit'].sum()
+    gpa = round((total_points_earned / total_course_units), 2) if total_course_units != 0 else 0
+    return pd.Series({
+        'Total_Points_Earned': total_points_earned,
+        'Total_Course_Units': total_course_units,
+        'GPA': gpa
+    })
+
+
+def gpa(result_sheet):
+    """The Academic_Performance table of the notebook."""
+    gpa_df = result_sheet.groupby(['Matric_Number', 'Session', 'Semester']).apply(calculate_gpa).reset_index()
+
+    # The CGPA accumulates the semesters in order
+    gpa_df = gpa_df.sort_values(by=['Matric_Number', 'Session', 'Semester'])
+    cumulative = gpa_df.groupby('Matric_Number')[['Total_Points_Earned', 'Total_Course_Units']].cumsum()
+    gpa_df['CGPA'] = round((cumulative['Total_Points_Earned'] / cumulative['Total_Course_Units']), 2)
+
+    # Classifying the GPA and CGPA
+    gpa_df['GPA_Classification'] = gpa_df['GPA'].apply(classify)
+    gpa_df['CGPA_Classification'] = gpa_df['CGPA'].apply(classify)
+    return gpa_df[['Matric_Number', 'Session', 'Semester', 'GPA', 'CGPA', 'GPA_Classification',
+                   'CGPA_Classification']]
+
+
+def get_first_and_last(df, col_name):
+    return df.iloc[0][col_name], df.iloc[-1][col_name]
+
+
+def first_last(academic_performance):
+    """The First_and_Last_Result table of the notebook."""
+    sorted_result = academic_performance.sort_values(by=['Matric_Number', 'Session', 'Semester'])
+    first_and_last = sorted_result.groupby('Matric_Number').apply(
+        lambda x: pd.Series({
+            'First_Session': get_first_and_last(x, 'Session')[0],
+            'Last_Session': get_first_and_last(x, 'Session')[1],
+            'First_GPA': get_first_and_last(x, 'GPA')[0],
+            'First_CGPA': get_first_and_last(x, 'CGPA')[0],
+            'Last_GPA': get_first_and_last(x, 'GPA')[1],
+            'Last_CGPA': get_first_and_last(x, 'CGPA')[1]
+        })
+    ).reset_index()
+
+    # Classifying the GPA and CGPA
+    for column in ['First_GPA', 'First_CGPA', 'Last_GPA', 'Last_CGPA']:
+        first_and_last[column + '_Classification'] = first_and_last[column].apply(classify)
+    return first_and_last
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import notebook
+from pipeline.classification import CLASS_BOUNDARIES, classify_scores
+
+
+def test_two_decimal_scores_match_notebook():
+    # Every GPA and CGPA the pipeline produces is rounded to 2dp
+    scores = pd.Series(np.round(np.arange(0, 501) / 100, 2))
+    expected = scores.map(notebook.classify)
+    assert classify_scores(scores).astype(object).tolist() == expected.tolist()
+
+
+@pytest.mark.parametrize('score', [np.nan, -0.01, 5.01, 7.5])
+def test_missing_and_out_of_range_scores_fail_as_in_notebook(score):
+    assert classify_scores(pd.Series([score])).tolist() == [notebook.classify(score)] == ['Fail']
+
+
+@pytest.mark.parametrize('score, notebook_class, expected', [
+    (4.495, 'Fail', 'Second Class Upper'),
+    (3.495, 'Fail', 'Second Class Lower'),
+    (2.395, 'Fail', 'Third Class'),
+    (1.495, 'Fail', 'Pass'),
+])
+def test_boundary_gaps(score, notebook_class, expected):
+    # The notebook's closed ranges left gaps between the classes, which
+    # fell through to 'Fail'; each class now runs up to the next bound
+    assert notebook.classify(score) == notebook_class
+    assert classify_scores(pd.Series([score])).tolist() == [expected]
+
+
+def test_categories_are_ordered_from_the_highest_class():
+    classification = classify_scores(pd.Series([1.2, 4.6]))
+    assert list(classification.cat.categories) == [name for name, _ in CLASS_BOUNDARIES]
+    assert classification.cat.ordered
+    assert classification[1] < classification[0]
+
+
+def test_custom_boundaries():
+    boundaries = [('Distinction', 4.0), ('Merit', 3.0), ('Fail', 0.0)]
+    assert classify_scores(pd.Series([4.0, 3.99, 3.0, 0.5]), boundaries).tolist() == \
+        ['Distinction', 'Merit', 'Merit', 'Fail']
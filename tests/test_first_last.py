@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import notebook
+from pipeline.first_last import first_last
+from pipeline.gpa import gpa
+
+
+def _results():
+    # Two students over two semesters, with GPAs of 5.0 and 4.0, and of 2.0
+    # and 4.0
+    return pd.DataFrame({
+        'Matric_Number': ['CSC/00001', 'CSC/00001', 'CSC/00002', 'CSC/00002'],
+        'Session': ['1990-1991', '1990-1991', '1990-1991', '1990-1991'],
+        'Semester': [1, 2, 1, 2],
+        'Course_Unit': [3.0, 3.0, 3.0, 3.0],
+        'Points_Earned': [15.0, 12.0, 6.0, 12.0],
+    })
+
+
+def _academic_performance(seed, students=40):
+    # Random semesters of a few students, out of order, some CGPAs missing
+    # (a first semester without course units) and some out of range
+    rng = np.random.default_rng(seed)
+    rows = 300
+    academic_performance = pd.DataFrame({
+        'Matric_Number': [f'CSC/{number:05d}' for number in rng.integers(0, students, rows)],
+        'Session': rng.choice(['1990-1991', '1991-1992', '1992-1993', '1993-1994'], rows),
+        'Semester': rng.integers(1, 3, rows),
+        'GPA': np.round(rng.uniform(0, 5, rows), 2),
+        'CGPA': np.round(rng.uniform(0, 5, rows), 2),
+    })
+    academic_performance.loc[rng.random(rows) < 0.05, 'CGPA'] = np.nan
+    academic_performance.loc[rng.random(rows) < 0.02, 'GPA'] = 5.5
+    return academic_performance.drop_duplicates(['Matric_Number', 'Session', 'Semester'])
+
+
+def _as_notebook(first_and_last):
+    # Classifications as the notebook's plain strings
+    columns = [column for column in first_and_last if column.endswith('_Classification')]
+    return first_and_last.astype(dict.fromkeys(columns, object))
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_first_last_matches_notebook(seed):
+    academic_performance = _academic_performance(seed)
+    expected = notebook.first_last(academic_performance)
+    pd.testing.assert_frame_equal(_as_notebook(first_last(academic_performance)), expected, check_dtype=False)
+
+
+def test_missing_and_out_of_range_cgpa_fail_as_in_notebook():
+    academic_performance = pd.DataFrame({
+        'Matric_Number': ['CSC/00001', 'CSC/00001', 'CSC/00002'],
+        'Session': ['1990-1991', '1990-1991', '1990-1991'],
+        'Semester': [1, 2, 1],
+        'GPA': [0.0, 4.0, 5.5],
+        'CGPA': [np.nan, 4.0, -1.0],
+    })
+    expected = notebook.first_last(academic_performance)
+    first_and_last = _as_notebook(first_last(academic_performance))
+    pd.testing.assert_frame_equal(first_and_last, expected, check_dtype=False)
+    assert first_and_last['First_CGPA_Classification'].tolist() == ['Fail', 'Fail']
+
+
+def test_boundary_gaps():
+    # GPAs between the notebook's closed ranges fell through to 'Fail'
+    academic_performance = pd.DataFrame({
+        'Matric_Number': ['CSC/00001', 'CSC/00001'],
+        'Session': ['1990-1991', '1990-1991'],
+        'Semester': [1, 2],
+        'GPA': [4.495, 3.495],
+        'CGPA': [4.495, 3.995],
+    })
+    assert notebook.first_last(academic_performance).loc[0, 'First_GPA_Classification'] == 'Fail'
+    assert notebook.first_last(academic_performance).loc[0, 'Last_GPA_Classification'] == 'Fail'
+    first_and_last = first_last(academic_performance)
+    assert first_and_last.loc[0, 'First_GPA_Classification'] == 'Second Class Upper'
+    assert first_and_last.loc[0, 'Last_GPA_Classification'] == 'Second Class Lower'
+
+
+def test_classifications_carried_over_from_academic_performance():
+    # Without boundaries, the classes are those Academic_Performance was
+    # classified by, not the default ones
+    boundaries = [('Distinction', 4.0), ('Merit', 3.0), ('Fail', 0.0)]
+    first_and_last = first_last(gpa(_results(), boundaries), boundaries=None)
+    assert first_and_last['First_GPA_Classification'].tolist() == ['Distinction', 'Fail']
+    assert first_and_last['Last_GPA_Classification'].tolist() == ['Distinction', 'Distinction']
+    assert first_and_last['Last_CGPA_Classification'].tolist() == ['Distinction', 'Merit']
+    pd.testing.assert_frame_equal(first_and_last, first_last(gpa(_results(), boundaries), boundaries))
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import notebook
+from pipeline.gpa import gpa
+
+
+def _results(seed, students=40):
+    # Random results of a few semesters per student, with semesters whose
+    # courses carry no units (the zero-unit guard) and results without
+    # points (a grade with no grade points)
+    rng = np.random.default_rng(seed)
+    rows = 3000
+    units = rng.choice([0.0, 2.0, 3.0, 4.0], rows, p=[0.1, 0.3, 0.4, 0.2])
+    points = units * rng.integers(0, 6, rows)
+    points[rng.random(rows) < 0.05] = np.nan
+    return pd.DataFrame({
+        'Matric_Number': [f'CSC/{number:05d}' for number in rng.integers(0, students, rows)],
+        'Session': rng.choice(['1990-1991', '1991-1992', '1992-1993', '1993-1994'], rows),
+        'Semester': rng.integers(1, 3, rows),
+        'Course_Unit': units,
+        'Points_Earned': points,
+    })
+
+
+def _zero_unit_student():
+    # A student whose first semester has no course units at all: a GPA of 0
+    # and a CGPA of 0/0
+    return pd.DataFrame({
+        'Matric_Number': ['CSC/99999'] * 3,
+        'Session': ['1990-1991', '1990-1991', '1990-1991'],
+        'Semester': [1, 1, 2],
+        'Course_Unit': [0.0, 0.0, 3.0],
+        'Points_Earned': [0.0, np.nan, 12.0],
+    })
+
+
+def _as_notebook(academic_performance):
+    # Classifications as the notebook's plain strings
+    return academic_performance.astype({'GPA_Classification': object, 'CGPA_Classification': object})
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_gpa_matches_notebook(seed):
+    results = pd.concat([_results(seed), _zero_unit_student()], ignore_index=True)
+    expected = notebook.gpa(results).reset_index(drop=True)
+    pd.testing.assert_frame_equal(_as_notebook(gpa(results)), expected, check_dtype=False)
+
+
+def test_zero_unit_semester():
+    academic_performance = gpa(_zero_unit_student())
+    assert academic_performance['GPA'].tolist() == [0.0, 4.0]
+    assert np.isnan(academic_performance['CGPA'][0])
+    assert academic_performance['CGPA_Classification'].tolist() == ['Fail', 'Second Class Upper']
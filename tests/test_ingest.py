@@ -0,0 +1,65 @@
+import pandas as pd
+
+from pipeline.first_last import first_last
+from pipeline.gpa import gpa
+from pipeline.ingest import ingest
+from pipeline.parquet import read_parquet, read_students, table_index_end, write_ingested, write_parquet
+
+
+def _results(matric_numbers, session):
+    return pd.DataFrame({
+        'Matric_Number': matric_numbers,
+        'Session': session,
+        'Semester': 1,
+        'Course_Code': 'CSC101',
+        'Course_Unit': 3.0,
+        'Points_Earned': 12.0,
+    })
+
+
+def _tables():
+    result_sheet = _results(['CSC/00001', 'CSC/00002'], '1990-1991')
+    academic_performance = gpa(result_sheet)
+    return {
+        'Result_sheet': result_sheet,
+        'Academic_Performance': academic_performance,
+        'First_and_Last_Result': first_last(academic_performance),
+    }
+
+
+def test_batch_ingested_twice_is_added_once():
+    batch = _results(['CSC/00001', 'CSC/00001'], '1991-1992').assign(Course_Code=['CSC201', 'CSC202'])
+    once = ingest(_tables(), batch)
+    twice = ingest(once, batch)
+    assert len(once['Result_sheet']) == 4
+    for name, table in once.items():
+        pd.testing.assert_frame_equal(twice[name], table)
+
+
+def test_results_repeated_in_a_batch_are_added_once():
+    batch = _results(['CSC/00002', 'CSC/00002', 'CSC/00003'], '1991-1992')
+    tables = ingest(_tables(), batch)
+    assert tables['Result_sheet']['Matric_Number'].tolist() == ['CSC/00001', 'CSC/00002', 'CSC/00002', 'CSC/00003']
+    assert tables['First_and_Last_Result']['Matric_Number'].tolist() == ['CSC/00001', 'CSC/00002', 'CSC/00003']
+
+
+def test_parquet_dataset_ingested_in_place(tmp_path):
+    # Reading only the batch's students and writing back only what changed
+    # gives the tables an ingest of the whole dataset gives
+    tables = {**_tables(), 'Registration': pd.DataFrame({'Matric_Number': ['CSC/00001']}),
+              'Biodata': pd.DataFrame({'Matric_Number': ['CSC/00001']})}
+    path = write_parquet(tables, str(tmp_path / 'Student_Data.parquet'))
+    batch = pd.concat([
+        _results(['CSC/00001'], '1990-1991').assign(Course_Code='CSC102', Points_Earned=3.0),
+        _results(['CSC/00003'], '1991-1992'),
+    ], ignore_index=True)
+
+    stored = read_students(path, ['CSC/00001', 'CSC/00003'])
+    write_ingested(stored, ingest(stored, batch, start=table_index_end(path, 'Result_sheet')), path)
+
+    expected = ingest(tables, batch)
+    for name, table in read_parquet(path).items():
+        keys = ['Matric_Number', 'Session', 'Semester'] if 'Session' in table else ['Matric_Number']
+        pd.testing.assert_frame_equal(
+            table.sort_values(keys, kind='stable').reset_index(drop=True),
+            expected[name].sort_values(keys, kind='stable').reset_index(drop=True).astype(table.dtypes.to_dict()))
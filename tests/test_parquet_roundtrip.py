@@ -0,0 +1,75 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# The web app modules are imported flat, as streamlit runs them
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'web_app'))
+
+import data_loader  # noqa: E402
+import snapshot_cache  # noqa: E402
+from pipeline.clean import clean_biodata  # noqa: E402
+from pipeline.parquet import write_parquet  # noqa: E402
+
+
+def _pipeline_tables():
+    # A few students, in the shape of the tables the pipeline writes;
+    # Biodata goes through the pipeline's own cleaning, so its columns are
+    # the categoricals recode returns, with '-' for missing states
+    matric_numbers = ['CSC/00001', 'CSC/00002', 'CSC/00003']
+    biodata = clean_biodata(pd.DataFrame({
+        'Matric_Number': matric_numbers,
+        'Sex': ['Male', 'female', 'Female'],
+        'Marital_Status': ['Single', None, 'Married'],
+        'Religion': ['Christian', 'Islam', None],
+        'State_of_Origin': ['Lagos', None, 'Osun'],
+        'Nationality': ['Nigerian', None, 'Nigerian'],
+        'YOA': [1990, 1991, 1991],
+    }))
+    semesters = pd.DataFrame({
+        'Matric_Number': np.repeat(matric_numbers, 2),
+        'Session': ['1990-1991', '1990-1991', '1991-1992', '1991-1992', '1991-1992', '1991-1992'],
+        'Semester': [1, 2, 1, 2, 1, 2],
+    })
+    registration = semesters.assign(Level=100)
+    result = semesters.assign(Course_Code='CSC101', Course_Title='Course CSC101', Lecturer='Dr 1',
+                              Level=100, Mark=[75, 64, 52, 41, 38, 90], Grade=['A', 'B', 'C', 'E', 'F', 'A'],
+                              Course_Unit=3.0)
+    academic_performance = semesters.assign(
+        GPA=[5.0, 4.0, 3.0, 1.0, 0.0, 5.0],
+        CGPA=[5.0, 4.5, 3.0, 2.0, 0.0, 2.5],
+        GPA_Classification=['First Class', 'Second Class Upper', 'Second Class Lower', 'Pass', 'Fail',
+                            'First Class'],
+        CGPA_Classification=['First Class', 'First Class', 'Second Class Lower', 'Third Class', 'Fail',
+                             'Second Class Lower'],
+    )
+    return {
+        'Registration': registration,
+        'Biodata': biodata,
+        'Result_sheet': result,
+        'Academic_Performance': academic_performance,
+        'First_and_Last_Result': pd.DataFrame(),
+    }
+
+
+@pytest.fixture
+def dataset_store(tmp_path, monkeypatch):
+    # Snapshots go to the test's own directory, not the web app's
+    monkeypatch.setattr(snapshot_cache, 'snapshot_dir', str(tmp_path / 'snapshots'))
+    path = write_parquet(_pipeline_tables(), str(tmp_path / 'Student_Data.parquet'))
+    return data_loader.DataStore(path)
+
+
+def test_every_frame_loads_from_pipeline_parquet(dataset_store):
+    data = dataset_store.current()
+    for name in data_loader.FRAMES:
+        assert len(data[name]) > 0, name
+
+
+def test_biodata_value_fixes_apply_to_categorical_columns(dataset_store):
+    biodata = dataset_store.current()['Biodata']
+    assert isinstance(biodata['State_of_Origin'].dtype, pd.CategoricalDtype)
+    assert sorted(biodata['State_of_Origin'].cat.categories) == ['Lagos', 'Osun', 'Unknown']
+    assert biodata.set_index('Matric_Number').loc['CSC/00002', 'State_of_Origin'] == 'Unknown'
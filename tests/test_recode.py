@@ -0,0 +1,27 @@
+import pandas as pd
+
+from pipeline.clean import clean_biodata, suggest_biodata_mappings
+from pipeline.recode import recode
+
+
+def test_unseen_values_kept_unless_suggestions_asked_for():
+    column = pd.Series(['Christian', 'Chistian', None], name='Religion')
+    mapping = {'Christain': 'Christian'}
+    assert recode(column, mapping).tolist()[:2] == ['Christian', 'Chistian']
+    assert recode(column, mapping, suggest=True).tolist()[:2] == ['Christian', 'Christian']
+
+
+def test_biodata_suggestions_reported_not_applied():
+    biodata = pd.DataFrame({
+        'Matric_Number': ['CSC/00001', 'CSC/00002'],
+        'Sex': ['Male', 'Female'],
+        'Marital_Status': ['Single', 'Single'],
+        'Religion': ['Christian', 'Chirstian'],
+        'State_of_Origin': ['Lagos', 'Lagos'],
+        'Nationality': ['Nigerian', 'Nigerian'],
+        'YOA': [1990, 1991],
+    })
+    cleaned = clean_biodata(biodata)
+    assert cleaned['Religion'].tolist() == ['Christian', 'Chirstian']
+    assert suggest_biodata_mappings(cleaned) == {'Religion': {'Chirstian': 'Christian'}}
+    assert clean_biodata(biodata, suggest_biodata_mappings(biodata))['Religion'].tolist() == ['Christian'] * 2
@@ -0,0 +1,14 @@
+import subprocess
+import sys
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_data_loader_imports_without_pipeline_only_dependencies():
+    # xlsxwriter is a dependency of the pipeline's workbook writer only, not
+    # listed in web_app/requirements.txt; blocking it must not stop the app
+    # from importing its data layer (in a fresh interpreter, so nothing is
+    # imported already)
+    code = "import sys; sys.modules['xlsxwriter'] = None; import data_loader, dataset_reader"
+    subprocess.run([sys.executable, '-c', code], cwd=os.path.join(ROOT, 'web_app'), check=True)
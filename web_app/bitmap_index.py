@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+
+def _to_words(positions, n_words):
+    # Bitmap of the given row positions, packed into 64-bit words
+    bits = np.zeros(n_words * 64, dtype=bool)
+    bits[positions] = True
+    return np.packbits(bits, bitorder='little').view(np.uint64)
+
+
+class BitmapIndex:
+    """Bitmap of the rows holding each value of some columns of a dataframe.
+
+    The bitmaps are packed 64 rows to a word and built once. A filter of
+    {column: selected values} is then the union of the bitmaps of the
+    selected values of each column, intersected across the columns: a
+    few word operations per selected value, instead of an isin over every
+    row. Missing values have no bitmap, so they never match a filter, as
+    with isin.
+    """
+
+    def __init__(self, df, columns):
+        self.n_rows = len(df)
+        self._n_words = -(-self.n_rows // 64)
+        self._bitmaps = {}
+        for column in columns:
+            codes, uniques = pd.factorize(df[column])
+            # Rows grouped by value, so each value's rows are one slice
+            order = np.argsort(codes, kind='stable')
+            bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+            self._bitmaps[column] = {
+                value: _to_words(order[bounds[code]:bounds[code + 1]], self._n_words)
+                for code, value in enumerate(uniques)
+            }
+
+    def values(self, column):
+        """Distinct values of an indexed column."""
+        return list(self._bitmaps[column])
+
+    def select(self, filters=None):
+        """Bitmap (as 64-bit words) of the rows matching filters of {column: selected values}.
+
+        A column that is not filtered (or filtered with None) matches every
+        row; selected values that do not occur match none.
+        """
+        words = np.full(self._n_words, np.iinfo(np.uint64).max, dtype=np.uint64)
+        for column, values in (filters or {}).items():
+            if values is None:
+                continue
+            bitmaps = self._bitmaps[column]
+            union = np.zeros(self._n_words, dtype=np.uint64)
+            for value in set(values):
+                if value in bitmaps:
+                    union |= bitmaps[value]
+            words &= union
+        return words
+
+    def mask(self, filters=None):
+        """Boolean mask of the rows matching the filters (see select)."""
+        bits = np.unpackbits(self.select(filters).view(np.uint8), count=self.n_rows, bitorder='little')
+        return bits.view(bool)
+
+    def rows(self, filters=None):
+        """Positions of the rows matching the filters (see select)."""
+        return np.flatnonzero(self.mask(filters))
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+
+from bitmap_index import BitmapIndex
+
+# Columns of Result_Sheet a course statistics query can filter on, besides
+# Course_Title itself
+FILTER_COLUMNS = ['Session', 'Level', 'Grade']
+
+# Statistics computed for every course
+STATISTICS = ['Count', 'Mean', 'Min', 'Max', 'Median', 'Std']
+
+
+class CourseMarkStats:
+    """Mark statistics of every course in Result_Sheet, under any filter.
+
+    The marks are sorted once by course and mark. Every filter keeps that
+    order, so the count, mean, min, max, median and standard deviation of
+    each course come out of one pass over the selected marks, by position
+    in each course's run, with no grouping or sorting per query. Results
+    without a course or a mark are left out, as groupby does.
+    """
+
+    def __init__(self, result_sheet):
+        codes, self.courses = pd.factorize(result_sheet['Course_Title'], sort=True)
+        marks = result_sheet['Mark']
+        present = (codes >= 0) & marks.notna().to_numpy()
+
+        # Rows of the sheet in course and mark order
+        rows = np.flatnonzero(present)
+        order = np.lexsort((marks.to_numpy()[rows], codes[rows]))
+        self._rows = rows[order]
+        self._codes = codes[self._rows]
+        self._marks = marks.to_numpy()[self._rows]
+        self._index = BitmapIndex(result_sheet, FILTER_COLUMNS)
+
+    def stats(self, filters=None):
+        """Statistics of every course in the results matching filters of {column: selected values}.
+
+        Returns one row per course present, in the order of groupby, with
+        the columns of STATISTICS (Min and Max of the type of the marks,
+        Std with one degree of freedom, as in pandas).
+        """
+        filters = dict(filters or {})
+        selected = np.ones(len(self._rows), dtype=bool)
+        courses = filters.pop('Course_Title', None)
+        if courses is not None:
+            selected &= np.isin(self._codes, self.courses.get_indexer(pd.Index(list(courses)).unique()))
+        if filters:
+            selected &= self._index.mask(filters)[self._rows]
+
+        codes = self._codes[selected]
+        marks = self._marks[selected]
+        values = marks.astype(np.float64)
+
+        # Every course's selected marks are a sorted run, so its min, max and
+        # median are read off the ends and the middle of the run
+        counts = np.bincount(codes, minlength=len(self.courses))
+        present = np.flatnonzero(counts)
+        counts = counts[present]
+        starts = np.cumsum(counts) - counts
+        means = np.bincount(codes, weights=values, minlength=len(self.courses))[present] / counts
+        deviations = np.bincount(codes, weights=(values - np.repeat(means, counts)) ** 2,
+                                 minlength=len(self.courses))[present]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            std = np.sqrt(deviations / (counts - 1))
+
+        return pd.DataFrame({
+            'Course_Title': self.courses.take(present),
+            'Count': counts,
+            'Mean': means,
+            'Min': marks[starts],
+            'Max': marks[starts + counts - 1],
+            'Median': (values[starts + (counts - 1) // 2] + values[starts + counts // 2]) / 2,
+            'Std': np.where(counts > 1, std, np.nan),
+        })
+
+
+def long_format(df, id_column, value_columns, var_name, value_name):
+    """pd.melt(df, id_column, value_columns, var_name, value_name), built directly from the columns."""
+    rows = np.tile(np.arange(len(df)), len(value_columns))
+    return pd.DataFrame({
+        id_column: df[id_column].iloc[rows].reset_index(drop=True),
+        var_name: np.repeat(value_columns, len(df)),
+        value_name: np.concatenate([df[column].to_numpy() for column in value_columns]),
+    })
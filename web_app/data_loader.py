@@ -1,25 +1,384 @@
-import pandas as pd
+import logging
 import os
+import sys
+import threading
+import time
+from collections.abc import Mapping
+import pandas as pd
 import streamlit as st
 
+# The pipeline package that builds the workbook sits next to web_app (and
+# the modules below import parts of it)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline.first_last import first_last  # noqa: E402
+from snapshot_cache import frame_hash, read_snapshot, write_snapshot, map_snapshot, snapshot_path  # noqa: E402
+from workbook_reader import read_workbook, sheet_fingerprints  # noqa: E402
+from schema import SCHEMA_VERSION, normalise  # noqa: E402
+from student_ids import StudentIndex  # noqa: E402
+from dataset_reader import read_dataset, dataset_fingerprints, dataset_stat  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
 base_dir = os.path.dirname(__file__)
-file_path = os.path.join(base_dir, 'Student_Data.xlsx')
 
-@st.cache_data
+# The Parquet dataset written by the pipeline is read if there is one,
+# otherwise the Excel workbook (STUDENT_DATA_PATH points elsewhere)
+dataset_path = os.path.join(base_dir, 'Student_Data.parquet')
+workbook_path = os.path.join(base_dir, 'Student_Data.xlsx')
+file_path = os.environ.get('STUDENT_DATA_PATH') or (dataset_path if os.path.isdir(dataset_path) else workbook_path)
+
+# Setting STUDENT_DATA_SHARED=1 makes every server process memory-map the
+# same snapshot files instead of keeping a private copy of the dataset
+shared_mode = os.environ.get('STUDENT_DATA_SHARED', '') == '1'
+
+# Setting STUDENT_DATA_APPROXIMATE_COUNTS=1 makes the pages estimate the
+# distinct student counts of the charts they label as approximate (see
+# student_sketches.count_label) from precomputed sketches (within about 1%)
+# instead of counting the students of every filtered row; all other counts
+# stay exact
+approximate_counts = os.environ.get('STUDENT_DATA_APPROXIMATE_COUNTS', '') == '1'
+
+# How often the workbook is checked for changes, in seconds (0 turns the
+# watcher off, and a new workbook is then only picked up on restart)
+poll_seconds = float(os.environ.get('STUDENT_DATA_POLL_SECONDS', '5'))
+
+# Copy-on-write is always on from pandas 3; older versions need it enabled
+# for the views handed out by LazyData to be independent of the cache
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+# Names the dataframes are exposed under, mapped to their sheet in the workbook
+SHEETS = {
+    "Academic_Performance": "Academic_Performance",
+    "Biodata": "Biodata",
+    "Registration": "Registration",
+    "Result_Sheet": "Result_sheet",
+}
+
+
+def _first_last(academic_performance):
+    # The classifications are carried over from Academic_Performance, which
+    # the pipeline classified by the boundaries it was run with
+    return first_last(academic_performance, boundaries=None)
+
+
+# Dataframes built on load from another one with a pipeline stage, rather
+# than read from their own sheet, mapped to (source, stage)
+DERIVED_SHEETS = {
+    "First_and_Last_Result": ("Academic_Performance", _first_last),
+}
+
+# Every dataframe exposed by LazyData
+FRAMES = [*SHEETS, *DERIVED_SHEETS]
+
+
+def _source(name):
+    # The dataframe whose sheet a dataframe is read or derived from
+    return DERIVED_SHEETS[name][0] if name in DERIVED_SHEETS else name
+
+
+def _build_frames(path, names):
+    # Parse the sheets the dataframes come from in one pass, derive the
+    # derived ones from the sheets as written, then normalise them all
+    sheet_names = sorted({SHEETS[_source(name)] for name in names})
+    read_tables = read_dataset if os.path.isdir(path) else read_workbook
+    sheets, _ = read_tables(path, sheet_names)
+    frames = {}
+    for name in names:
+        df = sheets[SHEETS[_source(name)]]
+        if name in DERIVED_SHEETS:
+            df = DERIVED_SHEETS[name][1](df)
+        frames[name] = normalise(name, df)
+    return frames
+
+
+class LazyData(Mapping):
+    """Mapping of the student dataframes that loads each one on first access.
+
+    A sheet with a snapshot is read on its own. When the workbook has to be
+    parsed, only the sheet asked for is parsed before returning; the other
+    sheets not loaded yet and without a snapshot are then parsed together
+    in the background, in one pass of read_workbook.
+
+    A LazyData is one immutable version of the workbook: when the file
+    changes, the store builds a new one and swaps it in, while pages that
+    are already running keep reading the one they started with.
+    """
+
+    def __init__(self, store, keys, frames):
+        self._store = store
+        # Snapshot key of every sheet, from its fingerprint in the workbook
+        self.keys = keys
+        # Loaded sheets, as (dataframe, content hash)
+        self._frames = frames
+
+    def _frame(self, name):
+        if name not in FRAMES:
+            raise KeyError(name)
+        if name not in self._frames:
+            with self._store.sheet_locks[name]:
+                stale = name not in self._frames and not self._store.load_sheets(self, name)
+            if stale:
+                # The file was replaced after this version was read, so the
+                # sheet can only come from the version that replaced it
+                return self._store.refreshed()._frame(name)
+        return self._frames[name]
+
+    def __getitem__(self, name):
+        # A shallow copy: with copy-on-write, a page assigning to a column
+        # or editing values only changes its own view, never the cached frame
+        return self._frame(name)[0].copy(deep=False)
+
+    def __iter__(self):
+        return iter(FRAMES)
+
+    def __len__(self):
+        return len(FRAMES)
+
+    def version(self, name):
+        """Content hash of a sheet, which only changes when its data does."""
+        return self._frame(name)[1]
+
+    def derived(self, builder, *names):
+        """Return builder(*sheets) for the named sheets, cached on their versions.
+
+        The result is shared by every session and survives reloads of the
+        workbook that leave those sheets unchanged. It must not be modified.
+        """
+        return self.cached((builder.__module__, builder.__qualname__), names,
+                           lambda: builder(*(self[name] for name in names)))
+
+    def cached(self, key, names, compute):
+        """Return compute(), cached like derived under `key` and the versions of the named sheets.
+
+        For aggregates built from something other than the sheets as they
+        are (e.g. a dataset joined from them, or with parameters): `key`
+        must identify what compute() builds from those sheets.
+        """
+        key = (key, tuple(self.version(name) for name in names))
+        derived = self._store.derived
+        if key not in derived:
+            derived[key] = compute()
+        return derived[key]
+
+
+class DataStore:
+    """The current version of the workbook, kept up to date by a watcher thread.
+
+    The watcher polls the file's size and modification time (for a Parquet
+    dataset, those of its files). Once a new version has stopped changing,
+    only the sheets whose fingerprint changed (in the zip directory of a
+    workbook, or the file listing of a dataset) are re-read, in the
+    background; a sheet whose data turns out to be identical keeps its
+    frame and version. The new LazyData is then swapped in as a whole.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.sheet_locks = {name: threading.Lock() for name in FRAMES}
+        # Aggregates built by LazyData.derived and LazyData.cached, keyed by
+        # the sheet versions they read
+        self.derived = {}
+        # Dictionary of matric numbers to integer student ids shared by all
+        # sheets and kept across reloads, so the ids stay stable
+        self.student_index = StudentIndex()
+        self._refresh_lock = threading.Lock()
+        self._state = LazyData(self, self._sheet_keys(), {})
+
+    def current(self):
+        return self._state
+
+    def _sheet_keys(self):
+        # Snapshots follow both the content of the sheet a dataframe comes
+        # from and the normalisation schema
+        fingerprint_tables = dataset_fingerprints if os.path.isdir(self.path) else sheet_fingerprints
+        fingerprints = fingerprint_tables(self.path, SHEETS.values())
+        return {name: f"{fingerprints[SHEETS[_source(name)]]}-s{SCHEMA_VERSION}" for name in FRAMES}
+
+    def _materialise(self, name, key, df):
+        # Saving the sheet to the snapshot for the next cold start; a
+        # read-only deployment simply keeps parsing the workbook
+        content_hash = frame_hash(df)
+        try:
+            write_snapshot(name, key, df, content_hash)
+        except OSError:
+            logger.warning("Could not write the snapshot of %s", name, exc_info=True)
+        else:
+            # In shared mode the other processes map the file just written
+            if shared_mode:
+                df, content_hash = map_snapshot(name, key)
+        return df, content_hash
+
+    def _add_student_ids(self, df):
+        # Dense int32 student ids, so distinct counts run on integers rather
+        # than on matric number strings
+        df['Student_Id'] = self.student_index.encode(df['Matric_Number'])
+        return df
+
+    def _pending(self, state, names):
+        # Those of the sheets that are not loaded yet and have no snapshot,
+        # with their lock taken (sheets another thread is already loading
+        # are left to it)
+        return [name for name in names
+                if name not in state._frames
+                and not os.path.exists(snapshot_path(name, state.keys[name]))
+                and self.sheet_locks[name].acquire(blocking=False)]
+
+    def _parse_sheets(self, state, names):
+        # Parse the sheets in one pass of the workbook and add them to state.
+        # If the file was replaced meanwhile, what was parsed is not the
+        # version of state: it is neither snapshotted under its keys nor
+        # added, and False is returned
+        frames = _build_frames(self.path, names)
+        keys = self._sheet_keys()
+        if any(keys[name] != state.keys[name] for name in names):
+            logger.info("%s changed while %s were parsed", self.path, names)
+            return False
+        for name, df in frames.items():
+            df, content_hash = self._materialise(name, state.keys[name], df)
+            state._frames[name] = self._add_student_ids(df), content_hash
+        return True
+
+    def _parse_in_background(self, state, names):
+        # Runs with the locks of the sheets held, and releases them
+        try:
+            self._parse_sheets(state, names)
+        except Exception:
+            # Each sheet is parsed again by the first page that needs it
+            logger.exception("Could not parse %s in the background", names)
+        finally:
+            for name in names:
+                self.sheet_locks[name].release()
+
+    def load_sheets(self, state, name):
+        # Called with the lock of `name` held; returns False if the file was
+        # replaced since state was read, and the sheet was not loaded.
+        # Reading the columnar snapshot of the sheet if one exists for its
+        # current content, which is much faster than parsing the workbook; in
+        # shared mode the first process to need it materialises it and the
+        # others only map it
+        data = map_snapshot(name, state.keys[name]) if shared_mode else read_snapshot(name, state.keys[name])
+        if data is not None:
+            df, content_hash = data
+            state._frames[name] = self._add_student_ids(df), content_hash
+            return True
+
+        # The workbook has to be parsed. Only the sheet asked for (and the
+        # dataframes from the same sheet) are parsed before returning, so a
+        # page never waits on the sheets of other pages
+        others = [other for other in FRAMES if other != name]
+        same_sheet = self._pending(state, [other for other in others if _source(other) == _source(name)])
+        try:
+            if not self._parse_sheets(state, [name, *same_sheet]):
+                return False
+        finally:
+            for other in same_sheet:
+                self.sheet_locks[other].release()
+
+        # The other sheets without a snapshot are then parsed together in a
+        # background thread, in one pass of read_workbook, so they are
+        # ready (and snapshotted) by the time their pages are opened
+        background = self._pending(state, others)
+        if background:
+            threading.Thread(target=self._parse_in_background, args=(state, background),
+                             name='student-data-loader', daemon=True).start()
+        return True
+
+    def refreshed(self):
+        """The current version, once the changes to the file are picked up."""
+        self.refresh()
+        return self._state
+
+    def refresh(self):
+        """Pick up changes to the workbook; returns the names of the changed sheets."""
+        with self._refresh_lock:
+            state = self._state
+            keys = self._sheet_keys()
+            changed = [name for name in FRAMES if keys[name] != state.keys[name]]
+            if not changed:
+                return []
+
+            # Unchanged sheets carry over as they are; changed sheets that
+            # nobody loaded yet are simply loaded lazily from the new file
+            frames = {name: entry for name, entry in state._frames.items() if name not in changed}
+            reload = [name for name in changed if name in state._frames]
+            if reload:
+                reloaded = _build_frames(self.path, reload)
+                if self._sheet_keys() != keys:
+                    # Replaced again while it was parsed: the next change
+                    # of the file is picked up instead
+                    logger.info("%s changed while it was reloaded", self.path)
+                    return []
+                for name, df in reloaded.items():
+                    df, content_hash = self._materialise(name, keys[name], df)
+                    if content_hash == state._frames[name][1]:
+                        # Same data under a new fingerprint: keeping the old
+                        # frame keeps its derived aggregates valid too
+                        frames[name] = state._frames[name]
+                    else:
+                        frames[name] = self._add_student_ids(df), content_hash
+
+            # Swapping in the new version in one assignment; reruns in flight
+            # finish on the old one
+            self._state = LazyData(self, keys, frames)
+
+            # Dropping the aggregates of sheet versions that are gone
+            versions = {content_hash for _, content_hash in frames.values()}
+            for key in list(self.derived):
+                if not versions.issuperset(key[1]):
+                    self.derived.pop(key, None)
+
+            updated = [name for name in reload if frames[name] is not state._frames[name]]
+            logger.info("Reloaded %s: sheets changed %s, data changed %s", self.path, changed, updated)
+            return changed
+
+    def _file_stat(self):
+        try:
+            if os.path.isdir(self.path):
+                return dataset_stat(self.path)
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _watch(self, interval):
+        seen = self._file_stat()
+        while True:
+            time.sleep(interval)
+            current = self._file_stat()
+            if current is None or current == seen:
+                continue
+            # Waiting for an upload in progress to finish: the file must
+            # stay the same for a whole interval before it is read
+            time.sleep(interval)
+            if self._file_stat() != current:
+                continue
+            try:
+                self.refresh()
+            except Exception:
+                # e.g. a file replaced by something that is not a workbook;
+                # the current data is kept and the file is retried on its next change
+                logger.exception("Could not reload %s", self.path)
+            seen = current
+
+    def start_watcher(self, interval):
+        thread = threading.Thread(target=self._watch, args=(interval,), name='student-data-watcher', daemon=True)
+        thread.start()
+        return thread
+
+
+# One store per process; cache_resource keeps a single copy of each frame
+# (and in shared mode, the mapped files), where cache_data would unpickle
+# a fresh copy on every call
+@st.cache_resource
+def _data_store():
+    # Only the workbook's zip directory is read here; no sheet is parsed
+    # until a page asks for it
+    store = DataStore(file_path)
+    if poll_seconds > 0:
+        store.start_watcher(poll_seconds)
+    return store
+
+
 def load_data():
-    # Load the Excel file
-    
-    # Load the individual sheets into dataframes
-    Academic_Performance = pd.read_excel(file_path, sheet_name='Academic_Performance')
-    Biodata = pd.read_excel(file_path, sheet_name='Biodata')
-    First_and_Last_Result = pd.read_excel(file_path, sheet_name='First_and_Last_Result')
-    Registration = pd.read_excel(file_path, sheet_name='Registration')
-    Result_Sheet = pd.read_excel(file_path, sheet_name='Result_sheet')
-    
-    return {
-        "Academic_Performance": Academic_Performance,
-        "Biodata": Biodata,
-        "First_and_Last_Result": First_and_Last_Result,
-        "Registration": Registration,
-        "Result_Sheet": Result_Sheet
-    }
+    return _data_store().current()
@@ -0,0 +1,55 @@
+import hashlib
+import logging
+import os
+import time
+
+from pipeline.parquet import table_path, read_parquet_table
+from workbook_reader import SheetReport
+
+logger = logging.getLogger(__name__)
+
+
+def read_dataset(path, table_names):
+    """Read several tables of a Parquet dataset written by the pipeline.
+
+    The counterpart of read_workbook for a Student_Data.parquet directory:
+    returns the dataframes keyed by table name and a SheetReport per
+    table, which is also logged.
+    """
+    frames, reports = {}, []
+    for table_name in table_names:
+        start = time.perf_counter()
+        frames[table_name] = read_parquet_table(path, table_name)
+        reports.append(SheetReport(table_name, len(frames[table_name]), time.perf_counter() - start))
+
+    for report in reports:
+        logger.info("Read table %s: %d rows in %.2fs", report.sheet, report.rows, report.seconds)
+    return frames, reports
+
+
+def _files(location):
+    # The files of a table: a single file, or those of its session directories
+    if not os.path.isdir(location):
+        return [location]
+    return sorted(os.path.join(directory, name)
+                  for directory, _, names in os.walk(location) for name in names)
+
+
+def dataset_fingerprints(path, table_names):
+    """Fingerprint each table of a Parquet dataset from the names, sizes and
+    modification times of its files, without reading them."""
+    fingerprints = {}
+    for table_name in table_names:
+        location = table_path(path, table_name)
+        digest = hashlib.sha256()
+        for file_name in _files(location):
+            stat = os.stat(file_name)
+            digest.update(f"{os.path.relpath(file_name, path)}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+        fingerprints[table_name] = digest.hexdigest()[:24]
+    return fingerprints
+
+
+def dataset_stat(path):
+    """(latest modification time, total size) of the files of a dataset, to poll it for changes."""
+    stats = [os.stat(file_name) for file_name in _files(path)]
+    return max((stat.st_mtime_ns for stat in stats), default=0), sum(stat.st_size for stat in stats)
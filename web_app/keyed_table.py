@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+
+class KeyedTable:
+    """A dataframe sorted by some key columns, with the row range of every key.
+
+    The rows of each combination of key values are one contiguous run of
+    the sorted frame, so a filter on the key columns selects runs from the
+    small table of runs and slices their rows, instead of testing every
+    row. Missing key values sort last and never match a filter, as with
+    isin.
+    """
+
+    def __init__(self, df, keys):
+        self.keys = list(keys)
+        self.frame = df.sort_values(self.keys, kind='stable', na_position='last',
+                                    ignore_index=True)
+
+        # Start of every run of equal keys in the sorted frame
+        codes = np.column_stack([pd.factorize(self.frame[key])[0] for key in self.keys])
+        changed = np.ones(len(self.frame), dtype=bool)
+        changed[1:] = (codes[1:] != codes[:-1]).any(axis=1)
+        starts = np.flatnonzero(changed)
+
+        self.runs = self.frame.loc[starts, self.keys].reset_index(drop=True)
+        self.runs['Start'] = starts
+        self.runs['Stop'] = np.append(starts[1:], len(self.frame))
+
+    def positions(self, filters):
+        """Positions in `frame` of the rows matching filters of {key column: selected values}.
+
+        A slice when the selected runs are adjacent (e.g. a single value of
+        the first key), an array of positions otherwise.
+        """
+        runs = self.runs
+        for column, values in filters.items():
+            runs = runs[runs[column].isin(list(values))]
+        starts = runs['Start'].to_numpy()
+        stops = runs['Stop'].to_numpy()
+        if len(starts) == 0:
+            return slice(0, 0)
+        if (starts[1:] == stops[:-1]).all():
+            return slice(int(starts[0]), int(stops[-1]))
+
+        lengths = stops - starts
+        offsets = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+        return offsets + np.arange(lengths.sum())
+
+    def rows(self, filters):
+        """Rows of `frame` matching filters of {key column: selected values}."""
+        return self.frame.iloc[self.positions(filters)]
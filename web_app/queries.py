@@ -0,0 +1,283 @@
+import logging
+import os
+import threading
+from collections import OrderedDict, namedtuple
+
+import pandas as pd
+import streamlit as st
+
+from bitmap_index import BitmapIndex
+from course_stats import CourseMarkStats, FILTER_COLUMNS as COURSE_STATS_FILTERS
+from keyed_table import KeyedTable
+from result_cube import ResultCube, CUBE_DIMENSIONS
+from student_ids import count_distinct, distinct_students
+from student_sketches import StudentSketches
+
+logger = logging.getLogger(__name__)
+
+# Number of query results kept by the cache, shared by all sessions (can be
+# changed with STUDENT_DATA_QUERY_CACHE_SIZE); the indexes and sketches
+# queries are answered from are kept with the data instead (LazyData.cached)
+CACHE_SIZE = int(os.environ.get('STUDENT_DATA_QUERY_CACHE_SIZE', '512'))
+
+# Measures a query can ask for by name, as (aggregation, column)
+MEASURES = {
+    'students': ('distinct', 'Student_Id'),
+    'rows': ('size', None),
+    'mean_mark': ('mean', 'Mark'),
+    'min_mark': ('min', 'Mark'),
+    'max_mark': ('max', 'Mark'),
+    'median_mark': ('median', 'Mark'),
+    'std_mark': ('std', 'Mark'),
+    'marks': ('count', 'Mark'),
+    'mean_gpa': ('mean', 'GPA'),
+    'mean_cgpa': ('mean', 'CGPA'),
+}
+
+# Measures of Result_Sheet the result cube holds, mapped to their rollup column
+CUBE_MEASURES = {
+    ('distinct', 'Student_Id'): 'Students',
+    ('mean', 'Mark'): 'Mark_Mean',
+    ('min', 'Mark'): 'Mark_Min',
+    ('max', 'Mark'): 'Mark_Max',
+}
+
+# Measures of Result_Sheet by course the course statistics engine computes
+# in one pass, mapped to their statistics column
+COURSE_STATS_MEASURES = {
+    ('count', 'Mark'): 'Count',
+    ('mean', 'Mark'): 'Mean',
+    ('min', 'Mark'): 'Min',
+    ('max', 'Mark'): 'Max',
+    ('median', 'Mark'): 'Median',
+    ('std', 'Mark'): 'Std',
+}
+
+# Datasets built from sheets (e.g. joins), queried like the sheets
+# themselves, mapped to (builder, sheet names, key columns)
+DATASETS = {}
+
+# Counters of the query cache
+CacheStats = namedtuple('CacheStats', ['hits', 'misses', 'size', 'maxsize'])
+
+
+class QueryCache:
+    """Least recently used cache of query results, bounded to `maxsize` entries."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, compute):
+        """Return the entry under `key`, computing and storing it on a miss."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        # Computed outside the lock, so a slow query does not hold up the
+        # others; sessions missing on the same key at once each compute it
+        value = compute()
+        with self._lock:
+            self._entries[key] = value
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def stats(self):
+        with self._lock:
+            return CacheStats(self.hits, self.misses, len(self._entries), self.maxsize)
+
+
+# One cache per process, shared by every session
+@st.cache_resource
+def _query_cache():
+    return QueryCache(CACHE_SIZE)
+
+
+def cache_stats():
+    """Hits, misses and size of the query cache."""
+    return _query_cache().stats()
+
+
+def register_dataset(name, builder, *sheets, keys=()):
+    """Make builder(*sheets) queryable as `name`, built once per version of the sheets.
+
+    With `keys`, the dataset is also kept sorted by those columns, and
+    filters on them slice its rows instead of masking every row.
+    """
+    DATASETS[name] = (builder, sheets, tuple(keys))
+
+
+def _measure(spec):
+    # A named measure or an (aggregation, column) pair
+    return MEASURES[spec] if isinstance(spec, str) else tuple(spec)
+
+
+def _sheets(dataset):
+    # The sheets a dataset is built from
+    return DATASETS[dataset][1] if dataset in DATASETS else (dataset,)
+
+
+def _frame(data, dataset):
+    if dataset in DATASETS:
+        builder, sheets, _ = DATASETS[dataset]
+        return data.derived(builder, *sheets)
+    return data[dataset]
+
+
+def query_key(data, dataset, filters=None, by=(), measures=(), approximate=False):
+    """Canonical hashable form of a query.
+
+    Queries that only differ in the order of their filters, of the values
+    selected or of their measures, or in filters of None, share a key. The
+    key holds the versions of the sheets read, so results of older data
+    are never returned, and whether distinct counts may be estimated.
+    """
+    versions = tuple(data.version(sheet) for sheet in _sheets(dataset))
+    filters = tuple(sorted((column, frozenset(values)) for column, values in (filters or {}).items()
+                           if values is not None))
+    by = (by,) if isinstance(by, str) else tuple(by)
+    return dataset, versions, filters, by, tuple(sorted(set(map(_measure, measures)))), bool(approximate)
+
+
+def _from_cube(data, filters, by, measures):
+    # Result_Sheet queries on the cube dimensions are rolled up from its cells
+    cube = data.derived(ResultCube, "Result_Sheet")
+    rolled = cube.rollup(list(by), filters, distinct=('distinct', 'Student_Id') in measures)
+    return rolled[list(by)], {measure: rolled[CUBE_MEASURES[measure]] for measure in measures}
+
+
+def _from_course_stats(data, filters, measures):
+    # Mark statistics of Result_Sheet by course come out of one pass of the
+    # course statistics engine
+    engine = data.derived(CourseMarkStats, "Result_Sheet")
+    stats = engine.stats(filters)
+    return stats[['Course_Title']], {measure: stats[COURSE_STATS_MEASURES[measure]] for measure in measures}
+
+
+def _sketches(data, dataset, dimensions, column):
+    # Sketches of the cells of the filtered and grouped columns, built once
+    # per version of the data
+    return data.cached(('sketches', dataset, dimensions, column), _sheets(dataset),
+                       lambda: StudentSketches(_frame(data, dataset), list(dimensions), id_column=column))
+
+
+def _from_sketches(data, dataset, filters, by, measures):
+    # Estimated distinct counts come straight out of the sketches: the
+    # groups are those of their selected cells, and no row is read
+    dimensions = tuple(sorted(set(filters) | set(by)))
+    values = {}
+    for measure in measures:
+        counts = _sketches(data, dataset, dimensions, measure[1]).count(list(by), filters)
+        values[measure] = counts['Matric_Number']
+    return counts[list(by)], values
+
+
+def _run(data, key):
+    dataset, _, filters, by, measures, approximate = key
+    filters = {column: values for column, values in filters}
+    columns = set(filters) | set(by)
+    distinct = ('distinct', 'Student_Id') in measures
+
+    if (dataset == "Result_Sheet" and by == ('Course_Title',)
+            and set(filters) <= {'Course_Title', *COURSE_STATS_FILTERS}
+            and all(measure in COURSE_STATS_MEASURES for measure in measures)
+            and not all(measure in CUBE_MEASURES for measure in measures)):
+        return _from_course_stats(data, filters, measures)
+
+    if (dataset == "Result_Sheet" and by and columns <= set(CUBE_DIMENSIONS)
+            and all(measure in CUBE_MEASURES for measure in measures)
+            and not (distinct and approximate)):
+        return _from_cube(data, filters, by, measures)
+
+    if approximate and by and all(aggregation == 'distinct' for aggregation, _ in measures):
+        return _from_sketches(data, dataset, filters, by, measures)
+
+    frame = _frame(data, dataset)
+    keys = DATASETS[dataset][2] if dataset in DATASETS else ()
+    if keys:
+        # The dataset sorted by its keys, built once per version of the data:
+        # filters on the keys select ranges of its rows
+        table = data.cached(('table', dataset, keys), _sheets(dataset), lambda: KeyedTable(frame, keys))
+        frame = table.frame
+        positions = table.positions({column: values for column, values in filters.items() if column in keys})
+        filters_left = {column: values for column, values in filters.items() if column not in keys}
+    else:
+        positions = slice(None)
+        filters_left = filters
+
+    rows = frame.iloc[positions]
+    if filters_left:
+        # Bitmaps of the filtered columns, built once per version of the data
+        columns_filtered = tuple(sorted(filters_left))
+        index = data.cached(('index', dataset, columns_filtered), _sheets(dataset),
+                            lambda: BitmapIndex(frame, columns_filtered))
+        rows = rows[index.mask(filters_left)[positions]]
+
+    values = {}
+    if not by:
+        # A single row of totals
+        groups = pd.DataFrame(index=[0])
+        for measure in measures:
+            aggregation, column = measure
+            if aggregation == 'distinct':
+                values[measure] = [count_distinct(rows[column])]
+            elif aggregation == 'size':
+                values[measure] = [len(rows)]
+            else:
+                values[measure] = [rows[column].agg(aggregation)]
+        return groups, values
+
+    grouped = rows.groupby(list(by), observed=True, sort=True)
+    groups = grouped.size().index.to_frame(index=False)
+    for measure in measures:
+        aggregation, column = measure
+        if aggregation == 'distinct' and approximate:
+            values[measure] = _sketches(data, dataset, tuple(sorted(columns)), column).count(
+                list(by), filters)['Matric_Number']
+        elif aggregation == 'distinct':
+            values[measure] = distinct_students(rows, list(by), id_column=column)['Matric_Number']
+        elif aggregation == 'size':
+            values[measure] = grouped.size().reset_index(drop=True)
+        else:
+            values[measure] = grouped[column].agg(aggregation).reset_index(drop=True)
+    return groups, values
+
+
+def query(data, dataset, filters=None, by=(), measures=None, approximate=False):
+    """Aggregate a dataset: the rows matching `filters`, grouped by `by`, reduced to `measures`.
+
+    `dataset` is the name of a sheet of `data` or of a dataset added with
+    register_dataset. `filters` maps columns to the values selected (None
+    leaves a column unfiltered), `by` is a column or a list of them, and
+    `measures` maps the name of each result column to a measure of
+    MEASURES or an (aggregation, column) pair. Returns one row per group,
+    sorted like groupby, or a single row of totals without `by`.
+
+    Results are memoised under the query_key of the query in an LRU cache
+    shared by all sessions. Queries on Result_Sheet that only involve the
+    cube dimensions are answered from its cells, mark statistics by course
+    the cube does not hold (median, std) from the course statistics engine.
+
+    Grouped distinct counts are estimated from sketches only if
+    `approximate` is set, which a page does for counts it labels with
+    student_sketches.count_label (passing data_loader.approximate_counts);
+    every other query, e.g. for option lists, is exact.
+    """
+    measures = measures or {'Matric_Number': 'students'}
+    key = query_key(data, dataset, filters, by, measures.values(), approximate)
+    cache = _query_cache()
+    groups, values = cache.get(key, lambda: _run(data, key))
+    logger.debug("Query %s: %s", key, cache.stats())
+
+    # A new frame on every call, so pages can modify what they are given
+    result = groups.copy()
+    for name, spec in measures.items():
+        result[name] = pd.Series(values[_measure(spec)]).to_numpy()
+    return result
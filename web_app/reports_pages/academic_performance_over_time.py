@@ -1,19 +1,18 @@
 import numpy as np
 import pandas as pd
 import streamlit as st
-from data_loader import load_data
+from data_loader import load_data, approximate_counts
+from sessions import session_dimension
+from queries import query, register_dataset
+from student_sketches import count_label
 import plotly.express as px
 import plotly.graph_objects as go
 
 # Loading the data
 data = load_data()
 
-# Passing the Data into Variables
+# Passing the Data into Variables (sheets are only loaded when accessed)
 Academic_Performance = data["Academic_Performance"]
-Biodata = data["Biodata"]
-First_and_Last_Result = data["First_and_Last_Result"]
-Registration = data["Registration"]
-Result_Sheet = data["Result_Sheet"]
 
 # Display the title and introductory text
 st.title("Academic Performance Over Time")
@@ -54,57 +53,67 @@ st.write("# Visualization")
 st.write("<br><br>", unsafe_allow_html=True)
 
 
-df_academic = Academic_Performance.copy()
-df_result = Result_Sheet.copy()
+def session_levels(df_result):
+    # Level of every student in every session of their results: one row per
+    # (Student_Id, Session) instead of one per course taken (the highest level
+    # when the courses of a session span several), with Session and Level as
+    # strings for filtering consistency
+    levels = df_result.groupby(['Student_Id', 'Session'], observed=True, sort=False)['Level'].max().reset_index()
+    levels['Session'] = levels['Session'].astype(str)
+    levels['Level'] = levels['Level'].astype(str)
+    return levels
 
-# Ensure the data types of columns that will be used for merging are the same
-df_academic['Session'] = df_academic['Session'].astype(str)
-df_result['Session'] = df_result['Session'].astype(str)
-df_academic['Matric_Number'] = df_academic['Matric_Number'].astype(str)
-df_result['Matric_Number'] = df_result['Matric_Number'].astype(str)
 
-# Merge the Academic_Performance and Result_Sheet DataFrames using Matric_Number and Session
-df_merged = pd.merge(df_academic, df_result[['Matric_Number', 'Session', 'Level']], on=['Matric_Number', 'Session'], how='left')
+def merged_performance(df_academic, df_result):
+    # Ensure the data types of columns that will be used for merging are the same
+    # (the frame is a view of the cached one, so converting its column does
+    # not need a copy of the whole frame first)
+    df_academic['Session'] = df_academic['Session'].astype(str)
+
+    # Add the Level of every Academic_Performance row from the level lookup, so
+    # the merged data has exactly one row per GPA record (merging the whole
+    # Result_Sheet repeated it once per course, and weighted the mean GPA and
+    # CGPA by the number of courses taken)
+    # (Student_Id is the integer id of the Matric_Number, shared by all the sheets)
+    df_merged = pd.merge(df_academic, session_levels(df_result), on=['Student_Id', 'Session'],
+                         how='left', validate='many_to_one')
+
+    # Convert relevant columns to strings for filtering consistency
+    df_merged['CGPA_Classification'] = df_merged['CGPA_Classification'].astype(str)
+    df_merged['Semester'] = df_merged['Semester'].astype(str)
+    df_merged['Level'] = df_merged['Level'].astype(str)
+
+    return df_merged
+
+
+# The merged data can be queried as Performance_Levels (it is built once per
+# version of the two sheets, for all users)
+register_dataset("Performance_Levels", merged_performance, "Academic_Performance", "Result_Sheet")
 
 # Define the session order and CGPA classification order
-session_order = [
-    '1990-1991', '1991-1992', '1992-1993', '1993-1994', '1994-1995',
-    '1995-1996', '1996-1997', '1997-1998', '1999-2000', '2000-2001',
-    '2001-2002', '2002-2003', '2003-2004', '2004-2005', '2005-2006',
-    '2007-2008', '2008-2009', '2009-2010', '2010-2011'
-]
+session_order = session_dimension(Academic_Performance['Session'])['Session'].tolist()
 
 cgpa_order = ['First Class', 'Second Class Upper', 'Second Class Lower', 'Third Class', 'Pass', 'Fail']
 semester_order = ['1', '2']
 level_order = ['100', '200', '300', '400', '500']
 
-# Convert relevant columns to strings for filtering consistency
-df_merged['CGPA_Classification'] = df_merged['CGPA_Classification'].astype(str)
-df_merged['Semester'] = df_merged['Semester'].astype(str)
-df_merged['Level'] = df_merged['Level'].astype(str)
-
 # Filters with default set to None
 selected_cgpa_classes = st.multiselect('Select CGPA Classification', options=cgpa_order, default=None)
 selected_semesters = st.multiselect('Select Semesters', options=semester_order, default=None)
 selected_levels = st.multiselect('Select Levels', options=level_order, default=None)
 
 # Apply filters only if selections are made
-filtered_df = df_merged.copy()
-
-if selected_cgpa_classes:
-    filtered_df = filtered_df[filtered_df['CGPA_Classification'].isin(selected_cgpa_classes)]
-
-if selected_semesters:
-    filtered_df = filtered_df[filtered_df['Semester'].isin(selected_semesters)]
-
-if selected_levels:
-    filtered_df = filtered_df[filtered_df['Level'].isin(selected_levels)]
+filters = {
+    'CGPA_Classification': selected_cgpa_classes or None,
+    'Semester': selected_semesters or None,
+    'Level': selected_levels or None,
+}
 
 # Plot 1: Average GPA and CGPA over Sessions
-avg_gpa_cgpa = filtered_df.groupby('Session').agg({
-    'GPA': 'mean',
-    'CGPA': 'mean'
-}).reset_index()
+avg_gpa_cgpa = query(data, "Performance_Levels", filters, 'Session', {
+    'GPA': 'mean_gpa',
+    'CGPA': 'mean_cgpa'
+})
 
 avg_gpa_cgpa['Session'] = pd.Categorical(avg_gpa_cgpa['Session'], categories=session_order, ordered=True)
 avg_gpa_cgpa = avg_gpa_cgpa.sort_values('Session')
@@ -117,8 +126,9 @@ fig1.update_layout(xaxis_title='Session', yaxis_title='Average Value',
                    plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)')
 
 # Plot 2: Percentage of Students in Each CGPA Classification per Session
-cgpa_percentage = filtered_df.groupby(['Session', 'CGPA_Classification'])['Matric_Number'].nunique().reset_index()
-total_students_per_session = cgpa_percentage.groupby('Session')['Matric_Number'].sum().reset_index()
+cgpa_percentage = query(data, "Performance_Levels", filters, ['Session', 'CGPA_Classification'],
+                        approximate=approximate_counts)
+total_students_per_session = cgpa_percentage.groupby('Session', observed=True)['Matric_Number'].sum().reset_index()
 cgpa_percentage = pd.merge(cgpa_percentage, total_students_per_session, on='Session', suffixes=('', '_total'))
 cgpa_percentage['Percentage'] = (cgpa_percentage['Matric_Number'] / cgpa_percentage['Matric_Number_total']) * 100
 
@@ -136,12 +146,13 @@ fig2 = px.line(cgpa_percentage, x='Session', y='Percentage', color='CGPA_Classif
                    'Pass': '#CAD626',
                    'Fail': '#105CFF',
                },
-               title='Percentage of Students in Each CGPA Classification Per Session')
+               title=count_label('Percentage of Students in Each CGPA Classification Per Session', approximate_counts))
 fig2.update_layout(xaxis_title='Session', yaxis_title='Percentage', 
                    plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)')
 
 # Plot 3: Grouped Horizontal Bar Chart with Pagination and Adjustable Height
-cgpa_count = filtered_df.groupby(['Session', 'CGPA_Classification'])['Matric_Number'].nunique().reset_index()
+cgpa_count = query(data, "Performance_Levels", filters, ['Session', 'CGPA_Classification'],
+                   approximate=approximate_counts)
 
 # Filter out sessions that are not in the data
 valid_sessions = cgpa_count['Session'].unique()
@@ -234,7 +245,7 @@ for cgpa_class in cgpa_order:
 # Add data labels to the bars, placed outside in front of the bars
 fig3.update_traces(texttemplate='%{x}', textposition='outside')
 fig3.update_layout(
-    title="Number of Students per Session by CGPA Classification",
+    title=count_label("Number of Students per Session by CGPA Classification", approximate_counts),
     xaxis_title='Number of Students',
     yaxis_title='Session',
     barmode='group',
@@ -4,16 +4,13 @@ import plotly.graph_objects as go
 import plotly.express as px
 import math
 from data_loader import load_data
+from queries import query, register_dataset
 
 # Loading the data
 data = load_data()
 
-# Passing the Data into Variables
-Academic_Performance = data["Academic_Performance"]
-Biodata = data["Biodata"]
+# Passing the Data into Variables (sheets are only loaded when accessed)
 First_and_Last_Result = data["First_and_Last_Result"]
-Registration = data["Registration"]
-Result_Sheet = data["Result_Sheet"]
 
 
 st.title("Comparative Analysis")
@@ -54,22 +51,30 @@ st.write("# Visualization - 1")
 st.write("<br><br>", unsafe_allow_html=True)
 
 
-# Merging the dataframes
-merged_df = pd.merge(Academic_Performance, Registration, 
-                     on=['Matric_Number', 'Session', 'Semester'], 
-                     how='inner')
+def merged_registration(academic_performance, registration):
+    # Merging the dataframes
+    # (on the integer Student_Id of each Matric_Number rather than the strings)
+    return pd.merge(academic_performance, registration.drop(columns='Matric_Number'),
+                    on=['Student_Id', 'Session', 'Semester'],
+                    how='inner')
+
+
+# The merged data can be queried as Performance_Registration (it is built
+# once per version of the two sheets, for all users, and indexed by Semester
+# and Session, so the semester filter and the sessions of the current page
+# only slice its rows on every rerun)
+register_dataset("Performance_Registration", merged_registration, "Academic_Performance", "Registration",
+                 keys=['Semester', 'Session'])
 
 # Sidebar - Semester Slicer
-semester = st.sidebar.selectbox("Select Semester:", options=['All'] + merged_df['Semester'].unique().tolist())
+semester = st.sidebar.selectbox("Select Semester:", options=['All'] + query(
+    data, "Performance_Registration", by='Semester', measures={'Count': 'rows'})['Semester'].tolist())
 
 # Filter the data based on the selected Semester
-if semester != 'All':
-    filtered_df = merged_df[merged_df['Semester'] == semester]
-else:
-    filtered_df = merged_df
+filters = {'Semester': [semester] if semester != 'All' else None}
 
 # Group sessions by sets of 2 or 3
-sessions = sorted(filtered_df['Session'].unique())
+sessions = sorted(query(data, "Performance_Registration", filters, 'Session', {'Count': 'rows'})['Session'])
 sessions_per_page = 2  # Adjust this to 3 if you want 3 sessions per page
 total_pages = math.ceil(len(sessions) / sessions_per_page)
 
@@ -103,8 +108,10 @@ start_idx = (st.session_state.current_page - 1) * sessions_per_page
 end_idx = start_idx + sessions_per_page
 current_sessions = sessions[start_idx:end_idx]
 
-# Filter the data for the current page sessions
-page_df = filtered_df[filtered_df['Session'].isin(current_sessions)]
+# Distinct students of every level, session and classification in the
+# current page sessions
+page_counts = query(data, "Performance_Registration", {**filters, 'Session': current_sessions},
+                    ['Level', 'Session', 'CGPA_Classification'], {'DistinctStudentCount': 'students'})
 
 # CGPA Classification order and colors
 classification_order = ['First Class', 'Second Class Upper', 'Second Class Lower', 'Third Class', 'Pass', 'Fail']
@@ -118,14 +125,11 @@ classification_colors = {
 }
 
 # Plotting the charts for each level
-levels = sorted(page_df['Level'].unique())
+levels = sorted(page_counts['Level'].unique())
 figures = []
 
 for level in levels:
-    level_df = page_df[page_df['Level'] == level]
-    grouped_df = level_df.groupby(['Session', 'CGPA_Classification']).agg(
-        DistinctStudentCount=('Matric_Number', 'nunique')
-    ).reset_index()
+    grouped_df = page_counts[page_counts['Level'] == level].drop(columns='Level')
 
     # Create Plotly bar chart for each level
     fig = go.Figure()
@@ -172,7 +176,7 @@ st.write("# CGPA Analysis")
 
 
 # Plot 1: Average of First CGPA across Session
-avg_first_cgpa = First_and_Last_Result.groupby('First_Session')['First_CGPA'].mean().reset_index()
+avg_first_cgpa = query(data, "First_and_Last_Result", by='First_Session', measures={'First_CGPA': ('mean', 'First_CGPA')})
 
 fig1 = px.line(avg_first_cgpa, 
                x='First_Session', 
@@ -186,7 +190,7 @@ fig1.update_layout(xaxis_tickangle=-45,
                    xaxis=dict(tickfont=dict(size=12)))
 
 # Plot 2: Average of Last CGPA across Session
-avg_last_cgpa = First_and_Last_Result.groupby('Last_Session')['Last_CGPA'].mean().reset_index()
+avg_last_cgpa = query(data, "First_and_Last_Result", by='Last_Session', measures={'Last_CGPA': ('mean', 'Last_CGPA')})
 
 fig2 = px.line(avg_last_cgpa, 
                x='Last_Session', 
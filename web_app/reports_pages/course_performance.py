@@ -3,15 +3,14 @@ import pandas as pd
 import plotly.graph_objects as go
 import streamlit as st
 from data_loader import load_data
+from sessions import session_dimension
+from queries import query
+from course_stats import long_format
 
 # Loading the data
 data = load_data()
 
-# Passing the Data into Variables
-Academic_Performance = data["Academic_Performance"]
-Biodata = data["Biodata"]
-First_and_Last_Result = data["First_and_Last_Result"]
-Registration = data["Registration"]
+# Passing the Data into Variables (sheets are only loaded when accessed)
 Result_Sheet = data["Result_Sheet"]
 
 
@@ -34,6 +33,9 @@ across various courses. Here, the following key metrics can be explored:
 - **Maximum Scores**: Discover the highest scores achieved, celebrating 
          exceptional academic achievements.
 
+- **Median Scores and Spread**: See the median score and the standard 
+         deviation of the scores of each course, in the table below the chart.
+
 """)
 
 st.markdown("<br><br><br>", unsafe_allow_html=True)
@@ -59,33 +61,38 @@ Adjust the height of the plot accordingly as required for better visibility.
 st.markdown("<br>", unsafe_allow_html=True)
 
 
-# Ensuring Level column is consistently an integer
-Result_Sheet['Level'] = pd.to_numeric(Result_Sheet['Level'], errors='coerce').fillna(0).astype(int)
+# Sessions in chronological order, from the session dimension of the data layer
+session_options = session_dimension(Result_Sheet['Session'])['Session'].tolist()
+
+
+def course_marks(filters=None):
+    # Max, Avg, Min and Median Marks, their standard deviation and the number
+    # of marks of every course in the results matching the filters, all from
+    # one pass of the course statistics engine; Avg_Mark is rounded to a
+    # whole number, of the same type as the marks (it lies between their min and max)
+    grouped = query(data, "Result_Sheet", filters, 'Course_Title', {
+        'Max_Mark': 'max_mark',
+        'Avg_Mark': 'mean_mark',
+        'Min_Mark': 'min_mark',
+        'Median_Mark': 'median_mark',
+        'Std_Mark': 'std_mark',
+        'Marks': 'marks',
+    })
+    grouped['Avg_Mark'] = grouped['Avg_Mark'].round().astype(grouped['Max_Mark'].dtype)
+
+    # Sorting by Max_Mark, then Avg_Mark, then Min_Mark
+    return grouped.sort_values(
+        by=['Max_Mark', 'Avg_Mark', 'Min_Mark'],
+        ascending=[False, False, False]
+    )
 
-# Grouping the data by Course_Title to get Max, Avg, and Min Marks, rounding Avg_Mark
-grouped_filtered_df = Result_Sheet.groupby('Course_Title')['Mark'].agg(
-    Max_Mark='max',
-    Avg_Mark=lambda x: round(x.mean()),  # Rounding Average Marks to whole numbers
-    Min_Mark='min'
-).reset_index()
 
-# Sorting by Max_Mark, then Avg_Mark, then Min_Mark
-grouped_filtered_df = grouped_filtered_df.sort_values(
-    by=['Max_Mark', 'Avg_Mark', 'Min_Mark'],
-    ascending=[False, False, False]
-)
+# Levels present in the results
+level_options = query(data, "Result_Sheet", by='Level')['Level'].tolist()
 
-# Extracting the sorted Course_Title order
-course_sort_order = grouped_filtered_df['Course_Title'].tolist()
-
-# Melting the dataframe to have a single 'Mark_Type' column for Max, Avg, Min Marks
-melted_df = pd.melt(
-    grouped_filtered_df,
-    id_vars=['Course_Title'],
-    value_vars=['Max_Mark', 'Avg_Mark', 'Min_Mark'],
-    var_name='Mark_Type',
-    value_name='Mark'
-)
+# Extracting the sorted Course_Title order from the marks of every course
+# over all the results (cached across reruns by the query layer)
+course_sort_order = course_marks()['Course_Title'].tolist()
 
 # Defining the color mapping for the different mark categories
 mark_colors = {
@@ -111,13 +118,13 @@ selected_courses = st.multiselect(
 
 selected_sessions = st.multiselect(
     'Select Sessions',
-    options=sorted(Result_Sheet['Session'].unique()),
+    options=session_options,
     default=None  # No default selection
 )
 
 selected_levels = st.multiselect(
     'Select Levels',
-    options=sorted(Result_Sheet['Level'].unique()),
+    options=level_options,
     default=None  # No default selection
 )
 
@@ -126,35 +133,22 @@ selected_levels = st.multiselect(
 if not selected_courses:
     selected_courses = course_sort_order
 if not selected_sessions:
-    selected_sessions = sorted(Result_Sheet['Session'].unique())
+    selected_sessions = session_options
 if not selected_levels:
-    selected_levels = sorted(Result_Sheet['Level'].unique())
-
-# Filtering the data based on user selection
-filtered_df = Result_Sheet[
-    (Result_Sheet['Course_Title'].isin(selected_courses)) &
-    (Result_Sheet['Session'].isin(selected_sessions)) &
-    (Result_Sheet['Level'].isin(selected_levels))
-]
-
-# Grouping the filtered data by Course_Title to get Max, Avg, and Min Marks, rounding Avg_Mark
-grouped_filtered_df = filtered_df.groupby('Course_Title')['Mark'].agg(
-    Max_Mark='max',
-    Avg_Mark=lambda x: round(x.mean()),  # Rounding Average Marks to whole numbers
-    Min_Mark='min'
-).reset_index()
-
-# Sorting by Max_Mark, then Avg_Mark, then Min_Mark
-grouped_filtered_df = grouped_filtered_df.sort_values(
-    by=['Max_Mark', 'Avg_Mark', 'Min_Mark'],
-    ascending=[False, False, False]
-)
+    selected_levels = level_options
 
-# Melting the dataframe again after filtering
-melted_df = pd.melt(
+# Max, Avg and Min Marks of every course in the selection
+grouped_filtered_df = course_marks({
+    'Course_Title': selected_courses,
+    'Session': selected_sessions,
+    'Level': selected_levels,
+})
+
+# Long format, with a single 'Mark_Type' column for Max, Avg, Min Marks
+melted_df = long_format(
     grouped_filtered_df,
-    id_vars=['Course_Title'],
-    value_vars=['Max_Mark', 'Avg_Mark', 'Min_Mark'],
+    'Course_Title',
+    ['Max_Mark', 'Avg_Mark', 'Min_Mark'],
     var_name='Mark_Type',
     value_name='Mark'
 )
@@ -256,3 +250,11 @@ fig.update_layout(
 # Display the chart in Streamlit
 st.plotly_chart(fig, use_container_width=True)
 
+# Table of the mark statistics of every course in the selection
+with st.expander("Mark Statistics by Course"):
+    st.dataframe(
+        grouped_filtered_df[['Course_Title', 'Marks', 'Avg_Mark', 'Median_Mark', 'Std_Mark', 'Min_Mark', 'Max_Mark']]
+        .round({'Std_Mark': 2}),
+        hide_index=True,
+        use_container_width=True
+    )
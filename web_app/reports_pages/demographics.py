@@ -6,16 +6,13 @@ import plotly.express as px
 import plotly.graph_objects as go
 import streamlit as st
 from data_loader import load_data
+from queries import query
 
 # Loading the data
 data = load_data()
 
-# Passing the Data into Variables
-Academic_Performance = data["Academic_Performance"]
-Biodata = data["Biodata"]
+# Passing the Data into Variables (sheets are only loaded when accessed)
 First_and_Last_Result = data["First_and_Last_Result"]
-Registration = data["Registration"]
-Result_Sheet = data["Result_Sheet"]
 
 
 st.title("Students' Demographics Report")
@@ -71,8 +68,8 @@ st.markdown("<br><br><br>", unsafe_allow_html=True)
 #-------------------------- Total Number of Registered Students  ----------------------------
 
 # Count the number of distinct Matric_Number
-distinct_students = Registration['Matric_Number'].nunique()
-student_with_biodata = Biodata["Matric_Number"].nunique()
+distinct_students = query(data, "Registration")['Matric_Number'][0]
+student_with_biodata = query(data, "Biodata")['Matric_Number'][0]
 # Number of Graduated Students
 graduated_students = First_and_Last_Result[(First_and_Last_Result['Last_GPA'] > 1) & 
                                            (First_and_Last_Result['Last_CGPA'] > 1)].shape[0]
@@ -122,15 +119,12 @@ st.markdown("<br><br><br><br>", unsafe_allow_html=True)
 
 #-------------------------- Number of Students by State of Origin -----------------------------
 
-def plot_students_by_state(Biodata):
-    # Replace missing or unknown values with 'Unknown'
-    Biodata['State_of_Origin'] = Biodata['State_of_Origin'].replace('-', 'Unknown')
+def plot_students_by_state(dataset):
+    # Grouping by State_of_Origin (missing states are already 'Unknown') and counting the number of students per state
+    state_counts = query(data, dataset, by='State_of_Origin', measures={'Number_of_Students': 'rows'})
 
-    # Grouping by State_of_Origin and counting the number of students per state
-    state_counts = Biodata['State_of_Origin'].value_counts().reset_index()
-    state_counts.columns = ['State_of_Origin', 'Number_of_Students']
-
-    # Sort the dataframe by Number_of_Students in descending order
+    # Sort the dataframe by Number_of_Students in ascending order, so the
+    # largest states are drawn at the top of the horizontal bar chart
     state_counts = state_counts.sort_values(by='Number_of_Students', ascending=True)
 
     # Create a slider for adjusting the height of the plot
@@ -173,8 +167,8 @@ st.write(
     unsafe_allow_html=True
 )
 
-# Call the function with the Biodata DataFrame
-plot_students_by_state(Biodata)
+# Call the function with the Biodata dataset
+plot_students_by_state("Biodata")
 
 
 
@@ -197,8 +191,10 @@ st.write(
 
 # Assuming Biodata is already loaded as a DataFrame
 # Calculate the counts of each gender and marital status
-gender_counts = Biodata['Sex'].value_counts()
-marital_status_counts = Biodata['Marital_Status'].value_counts()
+gender_counts = query(data, "Biodata", by='Sex', measures={'count': 'rows'}) \
+    .sort_values('count', ascending=False).set_index('Sex')['count']
+marital_status_counts = query(data, "Biodata", by='Marital_Status', measures={'count': 'rows'}) \
+    .sort_values('count', ascending=False).set_index('Marital_Status')['count']
 
 # Function to create a doughnut chart
 def create_doughnut_chart(labels, values, title, annotation):
@@ -255,10 +251,10 @@ st.markdown("<br><br><br><br>", unsafe_allow_html=True)
 # ----------------------- Number of Students by Nationality and Religion ------------------------
 
 # Function to plot vertical bar chart using Plotly
-def plot_vertical_bar_chart(dataframe, column, color):
+def plot_vertical_bar_chart(dataset, column, color):
     # Calculate value counts for the specified column
-    counts = dataframe[column].value_counts().reset_index()
-    counts.columns = [column, 'Number of Students']
+    counts = query(data, dataset, by=column, measures={'Number of Students': 'rows'}) \
+        .sort_values('Number of Students', ascending=False)
 
     # Create the bar chart using Plotly
     fig = px.bar(counts, x=column, y='Number of Students', text='Number of Students',
@@ -293,10 +289,10 @@ col1, col2 = st.columns(2)
 
 # Plot for Nationality
 with col1:
-    fig1 = plot_vertical_bar_chart(Biodata, 'Nationality', '#DE6A73')
+    fig1 = plot_vertical_bar_chart("Biodata", 'Nationality', '#DE6A73')
     st.plotly_chart(fig1)
 
 # Plot for Religion
 with col2:
-    fig2 = plot_vertical_bar_chart(Biodata, 'Religion', '#DE6A73')
+    fig2 = plot_vertical_bar_chart("Biodata", 'Religion', '#DE6A73')
     st.plotly_chart(fig2)
@@ -7,18 +7,12 @@ import plotly.graph_objects as go
 import altair as alt
 import streamlit as st
 from data_loader import load_data
+from queries import query
 
 
 # Loading the data
 data = load_data()
 
-# Passing the Data into Variables
-Academic_Performance = data["Academic_Performance"]
-Biodata = data["Biodata"]
-First_and_Last_Result = data["First_and_Last_Result"]
-Registration = data["Registration"]
-Result_Sheet = data["Result_Sheet"]
-
 
 st.title("Enrollment Trend Analysis")
 
@@ -61,14 +55,9 @@ st.markdown("<br>", unsafe_allow_html=True)
 
 #------------------------------ Total Number of Students by Session ------------------------------
 
-# Correcting the wrong entries in the Session column
-Registration['Session'] = Registration['Session'].replace({
-    '90-92': '1990-1991',
-    '97/98': '1997-1998'
-})
-
 # Grouping the data by 'Session' and counting the number of unique 'Matric_Number'
-students_by_session = Registration.groupby('Session')['Matric_Number'].nunique().reset_index()
+# (session labels are canonicalised and ordered chronologically by the data layer)
+students_by_session = query(data, "Registration", by='Session')
 
 # Creating the line chart using Plotly Express
 fig = px.line(students_by_session, 
@@ -92,7 +81,7 @@ st.markdown("<br><br><br>", unsafe_allow_html=True)
 
 
 # Grouping the data by 'Session' and counting the number of unique 'Matric_Number'
-students_by_YOA = Biodata.groupby('YOA')['Matric_Number'].nunique().reset_index()
+students_by_YOA = query(data, "Biodata", by='YOA')
 
 # Creating the line chart using Plotly Express
 fig = px.line(students_by_YOA, 
@@ -117,7 +106,7 @@ st.markdown("<br><br><br>", unsafe_allow_html=True)
 
 # Assuming Biodata is already loaded as a DataFrame
 # Group by YOA and Sex, and count the number of students
-biodata_grouped = Biodata.groupby(['YOA', 'Sex']).size().reset_index(name='count')
+biodata_grouped = query(data, "Biodata", by=['YOA', 'Sex'], measures={'count': 'rows'})
 
 # Sort by YOA in descending order based on the total number of students admitted
 biodata_grouped['YOA'] = pd.Categorical(
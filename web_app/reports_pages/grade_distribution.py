@@ -1,5 +1,8 @@
 import streamlit as st
-from data_loader import load_data
+from data_loader import load_data, approximate_counts
+from sessions import session_dimension
+from queries import query
+from student_sketches import count_label
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
@@ -7,11 +10,7 @@ import plotly.graph_objects as go
 # Loading the data
 data = load_data()
 
-# Passing the Data into Variables
-Academic_Performance = data["Academic_Performance"]
-Biodata = data["Biodata"]
-First_and_Last_Result = data["First_and_Last_Result"]
-Registration = data["Registration"]
+# Passing the Data into Variables (sheets are only loaded when accessed)
 Result_Sheet = data["Result_Sheet"]
 
 
@@ -40,11 +39,15 @@ st.write("# Data Visualizations")
 
 
 
-# Ensuring Level column is consistently an integer
-Result_Sheet['Level'] = pd.to_numeric(Result_Sheet['Level'], errors='coerce').fillna(0).astype(int)
+# Sessions in chronological order, from the session dimension of the data layer
+session_options = session_dimension(Result_Sheet['Session'])['Session'].tolist()
+
+# Levels present in the results
+level_options = query(data, "Result_Sheet", by='Level')['Level'].tolist()
 
 # Defining the sorting order for Course Titles based on the total number of distinct Matric_Number
-course_sort_order = Result_Sheet.groupby('Course_Title')['Matric_Number'].nunique().sort_values(ascending=False).index.tolist()
+course_sort_order = query(data, "Result_Sheet", by='Course_Title') \
+    .sort_values('Matric_Number', ascending=False)['Course_Title'].tolist()
 
 # Define the color mapping for grades
 grade_colors = {
@@ -71,13 +74,13 @@ selected_courses = st.multiselect(
 
 selected_sessions = st.multiselect(
     'Select Sessions',
-    options=sorted(Result_Sheet['Session'].unique()),
+    options=session_options,
     default=None  # No default selection
 )
 
 selected_levels = st.multiselect(
     'Select Levels',
-    options=sorted(Result_Sheet['Level'].unique()),
+    options=level_options,
     default=None  # No default selection
 )
 
@@ -85,20 +88,16 @@ selected_levels = st.multiselect(
 if not selected_courses:
     selected_courses = course_sort_order
 if not selected_sessions:
-    selected_sessions = sorted(Result_Sheet['Session'].unique())
+    selected_sessions = session_options
 if not selected_levels:
-    selected_levels = sorted(Result_Sheet['Level'].unique())
-
-# Filtering the data based on user selection
-filtered_df = Result_Sheet[
-    (Result_Sheet['Course_Title'].isin(selected_courses)) &
-    (Result_Sheet['Session'].isin(selected_sessions)) &
-    (Result_Sheet['Level'].isin(selected_levels))
-]
+    selected_levels = level_options
 
-# Grouping the data by Course_Title and Grade and count distinct Matric_Number
-grouped_filtered_df = filtered_df.groupby(['Course_Title', 'Grade'])['Matric_Number'].nunique().reset_index()
-grouped_filtered_df.columns = ['Course_Title', 'Grade', 'Distinct_Students']
+# Counting the distinct students of every Course_Title and Grade in the selection
+grouped_filtered_df = query(data, "Result_Sheet", {
+    'Course_Title': selected_courses,
+    'Session': selected_sessions,
+    'Level': selected_levels,
+}, ['Course_Title', 'Grade'], {'Distinct_Students': 'students'}, approximate=approximate_counts)
 
 # Sorting the data: first by Course_Title, then by Distinct_Students within each Course_Title
 grouped_filtered_df['Course_Title'] = pd.Categorical(grouped_filtered_df['Course_Title'], categories=course_sort_order, ordered=True)
@@ -174,7 +173,7 @@ plot_height = st.slider('Adjust plot height for Visibility', min_value=100, max_
 # Updating layout to group bars, remove background, and customize axes
 fig.update_layout(
     barmode='group',
-    title="Distribution of Grades by Course",
+    title=count_label("Distribution of Grades by Course", approximate_counts),
     xaxis_title='Number of Students',
     yaxis_title='Course Title',
     yaxis=dict(
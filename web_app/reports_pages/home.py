@@ -4,12 +4,7 @@ from data_loader import load_data
 # Loading the data
 data = load_data()
 
-# Passing the Data into Variables
-Academic_Performance = data["Academic_Performance"]
-Biodata = data["Biodata"]
-First_and_Last_Result = data["First_and_Last_Result"]
-Registration = data["Registration"]
-Result_Sheet = data["Result_Sheet"]
+# The home page shows no data, so no sheet is loaded here
 
 
 # Writing the title of the home page
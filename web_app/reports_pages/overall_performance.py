@@ -4,16 +4,14 @@ import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
 from data_loader import load_data
+from queries import query
+from sessions import session_dimension
 
 # Loading the data
 data = load_data()
 
-# Passing the Data into Variables
-Academic_Performance = data["Academic_Performance"]
-Biodata = data["Biodata"]
+# Passing the Data into Variables (sheets are only loaded when accessed)
 First_and_Last_Result = data["First_and_Last_Result"]
-Registration = data["Registration"]
-Result_Sheet = data["Result_Sheet"]
 
 
 st.title("Overall Performance Overview")
@@ -44,24 +42,14 @@ performance and track the progress of graduating students by their final CGPA.
 """)
 
 
-df = First_and_Last_Result.copy()
+df = First_and_Last_Result
 
-# Define the session order and CGPA classification order
-session_order = [
-    '1990-1991', '1991-1992', '1992-1993', '1993-1994', '1994-1995',
-    '1995-1996', '1996-1997', '1997-1998', '1999-2000', '2000-2001',
-    '2001-2002', '2002-2003', '2003-2004', '2004-2005', '2005-2006',
-    '2007-2008', '2008-2009', '2009-2010', '2010-2011'
-]
+# Define the session order (from the session dimension of the data layer,
+# where session labels are already canonical) and CGPA classification order
+session_order = session_dimension(df['Last_Session'])['Session'].tolist()
 
 cgpa_order = ['First Class', 'Second Class Upper', 'Second Class Lower', 'Third Class', 'Pass', 'Fail']
 
-# Replace session values as per the requirement (modify this if needed for correct session values)
-df['Last_Session'] = df['Last_Session'].replace({
-    '97/98': '1997-1998',
-    '90-92': '1990-1991'
-})
-
 # Filter by Session
 selected_sessions = st.multiselect('Filter by Session:', options=session_order, default=[])
 
@@ -70,14 +58,16 @@ if not selected_sessions:
     selected_sessions = df['Last_Session'].unique()
 
 # Filter the dataframe based on selected sessions
-filtered_df = df[df['Last_Session'].isin(selected_sessions)]
+filters = {'Last_Session': list(selected_sessions)}
 
 # Ensure only sessions present in the filtered data are used
-valid_sessions = filtered_df['Last_Session'].unique()
+valid_sessions = query(data, "First_and_Last_Result", filters, 'Last_Session', {'Count': 'rows'})['Last_Session'].tolist()
 session_order = [s for s in session_order if s in valid_sessions]
 
 # Doughnut Chart (CGPA Classification Distribution)
-cgpa_distribution = filtered_df['Last_CGPA_Classification'].value_counts().reset_index()
+# (classifications no student falls in are left out of the chart)
+cgpa_distribution = query(data, "First_and_Last_Result", filters, 'Last_CGPA_Classification', {'Count': 'rows'})
+cgpa_distribution = cgpa_distribution.sort_values('Count', ascending=False).reset_index(drop=True)
 cgpa_distribution.columns = ['CGPA_Classification', 'Count']
 
 # Define consistent colors for the charts
@@ -111,12 +101,10 @@ fig_doughnut.update_layout(
 st.plotly_chart(fig_doughnut, use_container_width=True)
 
 # Grouped Horizontal Bar Chart with Pagination and Adjustable Height
-cgpa_count = filtered_df.groupby(['Last_Session', 'Last_CGPA_Classification'])['Matric_Number'].nunique().reset_index()
+cgpa_count = query(data, "First_and_Last_Result", filters, ['Last_Session', 'Last_CGPA_Classification'])
 cgpa_count.columns = ['Session', 'CGPA_Classification', 'Distinct_Students']
 
-# Sort sessions and CGPA classifications
-cgpa_count['Session'] = pd.Categorical(cgpa_count['Session'], categories=session_order, ordered=True)
-cgpa_count['CGPA_Classification'] = pd.Categorical(cgpa_count['CGPA_Classification'], categories=cgpa_order, ordered=True)
+# Sort sessions and CGPA classifications (both are ordered categoricals)
 cgpa_count = cgpa_count.sort_values(['Session', 'CGPA_Classification'])
 
 # Pagination logic
@@ -1,5 +1,8 @@
 import streamlit as st
-from data_loader import load_data
+from data_loader import load_data, approximate_counts
+from sessions import session_dimension
+from queries import query
+from student_sketches import count_label
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
@@ -7,12 +10,8 @@ import plotly.graph_objects as go
 # Loading the data
 data = load_data()
 
-# Passing the Data into Variables
-Academic_Performance = data["Academic_Performance"]
-Biodata = data["Biodata"]
-First_and_Last_Result = data["First_and_Last_Result"]
+# Passing the Data into Variables (sheets are only loaded when accessed)
 Registration = data["Registration"]
-Result_Sheet = data["Result_Sheet"]
 
 
 # Page title and introduction
@@ -48,24 +47,13 @@ st.write("# Data Visualizations")
 
 st.markdown("<br><br>", unsafe_allow_html=True)
 
-# Replacing session labels with desired format
-session_mapping = {
-    '97/98': '1997-1998',
-    '90-92': '1990-1991'
-    # Add other mappings as necessary
-}
 
-# Applying the session mapping
-Registration['Session'] = Registration['Session'].replace(session_mapping)
+# Levels present in the registrations
+level_options = query(data, "Registration", by='Level')['Level'].tolist()
 
-# Defining the custom sorting order for sessions from 1990 to 2011
-custom_sort_order = [
-    '1990-1991', '1991-1992', '1992-1993',  '1994-1995',
-    '1995-1996', '1996-1997', '1997-1998', '1998-1999', '1999-2000',
-    '2000-2001', '2001-2002', '2002-2003', '2003-2004', 
-    '2005-2006', '2006-2007', '2007-2008', '2008-2009', '2009-2010',
-    '2010-2011'
-]
+# Sorting order for sessions, from the session dimension of the data layer
+# (session labels are already canonical there)
+custom_sort_order = session_dimension(Registration['Session'])['Session'].tolist()
 
 
 # Option to display everything together or use pagination
@@ -85,7 +73,7 @@ selected_sessions = st.multiselect(
 
 selected_levels = st.multiselect(
     'Select Levels',
-    options=sorted(Registration['Level'].unique()),
+    options=level_options,
     default= None #sorted(Registration['Level'].unique())  # Show all by default
 )
 
@@ -95,16 +83,14 @@ st.markdown("<br><br>", unsafe_allow_html=True)
 if not selected_sessions:
     selected_sessions = custom_sort_order
 if not selected_levels:
-    selected_levels = sorted(Registration['Level'].unique())
-
-# Filter the data based on user selection
-filtered_data = Registration[
-    (Registration['Session'].isin(selected_sessions)) &
-    (Registration['Level'].isin(selected_levels))
-]
+    selected_levels = level_options
 
-# Group the data by 'Session' and 'Level' and count the number of distinct students
-student_counts = filtered_data.groupby(['Session', 'Level'])['Matric_Number'].nunique().reset_index(name='Distinct_Students')
+# Filter the data based on user selection, then group it by 'Session' and
+# 'Level' and count the number of distinct students
+student_counts = query(data, "Registration", {
+    'Session': selected_sessions,
+    'Level': selected_levels,
+}, ['Session', 'Level'], {'Distinct_Students': 'students'}, approximate=approximate_counts)
 
 
 # Pagination logic
@@ -168,7 +154,7 @@ level_colors = {
 fig = go.Figure()
 
 # Loop through each level and add a trace for each level
-for level in sorted(filtered_data['Level'].unique()):
+for level in sorted(student_counts['Level'].unique()):
     level_data = student_counts_paginated[student_counts_paginated['Level'] == level]
     fig.add_trace(go.Bar(
         y=level_data['Session'],
@@ -186,7 +172,7 @@ plot_height = st.slider('Adjust plot height for Visibility', min_value=100, max_
 # Update layout to group bars, remove background, and customize axis
 fig.update_layout(
     barmode='group',
-    title="Number of Students by Session and Level",
+    title=count_label("Number of Students by Session and Level", approximate_counts),
     xaxis_title='Number of Students',
     yaxis_title='Session',
     yaxis=dict(
@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+
+from bitmap_index import BitmapIndex
+
+# Finest grain of the cube: every combination of these present in Result_Sheet
+CUBE_DIMENSIONS = ['Course_Title', 'Session', 'Level', 'Grade']
+
+# Measures of every cell, and how cells are rolled up into a group
+CELL_MEASURES = {
+    'Count': 'sum',
+    'Mark_Sum': 'sum',
+    'Mark_Min': 'min',
+    'Mark_Max': 'max',
+}
+
+
+class ResultCube:
+    """Result_Sheet pre-aggregated over (Course_Title, Session, Level, Grade).
+
+    Each cell holds the number of marks, their sum, minimum and maximum,
+    and the set of students it contains, so any filter on the dimensions
+    and any grouping of them is answered from the cells (a few thousand
+    rows) instead of the results. Distinct student counts stay exact: the
+    student sets of the selected cells are merged, not their counts.
+    """
+
+    def __init__(self, result_sheet):
+        # Missing keys get cells of their own, so results without a grade
+        # still count towards the marks of their course
+        grouped = result_sheet.groupby(CUBE_DIMENSIONS, observed=True, dropna=False, sort=True)
+        cells = grouped.size().index.to_frame(index=False)
+        cell_ids = grouped.ngroup().to_numpy()
+        marks = result_sheet['Mark'].groupby(cell_ids)
+        cells['Count'] = marks.count().to_numpy()
+        # Summed as int64 (floats if some marks are missing), which a
+        # column of int16 marks would overflow
+        exact = pd.api.types.is_integer_dtype(result_sheet['Mark']) and not result_sheet['Mark'].hasnans
+        cells['Mark_Sum'] = result_sheet['Mark'].astype('int64' if exact else 'float64').groupby(cell_ids).sum().to_numpy()
+        cells['Mark_Min'] = marks.min().to_numpy()
+        cells['Mark_Max'] = marks.max().to_numpy()
+        self.cells = cells
+        # Bitmaps of the cells holding each value of every dimension
+        self._index = BitmapIndex(cells, CUBE_DIMENSIONS)
+
+        # Students of every cell, as one sorted run of student ids per
+        # cell: the ids of cell i are _students[_offsets[i]:_offsets[i + 1]]
+        student_ids = result_sheet['Student_Id'].to_numpy()
+        present = student_ids >= 0
+        self._n_ids = int(student_ids.max()) + 1 if present.any() else 1
+        pairs = np.unique(cell_ids[present].astype(np.int64) * self._n_ids + student_ids[present])
+        self._students = (pairs % self._n_ids).astype(np.int32)
+        self._offsets = np.searchsorted(pairs // self._n_ids, np.arange(len(cells) + 1))
+
+    def __len__(self):
+        return len(self.cells)
+
+    def select(self, filters=None):
+        """Boolean mask of the cells matching filters of {dimension: selected values}.
+
+        A dimension that is not filtered (or filtered with None) matches
+        every cell, including those where it is missing.
+        """
+        return self._index.mask(filters)
+
+    def _cell_students(self, cells):
+        # Student ids of the given cells, concatenated, with the position
+        # of the cell each one comes from
+        starts = self._offsets[cells]
+        lengths = self._offsets[cells + 1] - starts
+        positions = np.repeat(np.arange(len(cells)), lengths)
+        rows = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths) + np.repeat(starts, lengths)
+        return self._students[rows], positions
+
+    def rollup(self, by, filters=None, distinct=False):
+        """Aggregate the cells matching `filters` by the dimensions `by`.
+
+        Returns one row per group present (sorted like groupby, missing
+        keys left out) with Count, Mark_Sum, Mark_Min, Mark_Max and
+        Mark_Mean, plus the distinct number of students in Students if
+        `distinct` is set.
+        """
+        by = [by] if isinstance(by, str) else list(by)
+        selected = np.flatnonzero(self.select(filters))
+        cells = self.cells.iloc[selected]
+        grouped = cells.groupby(by, observed=True, sort=True)
+        result = grouped.agg(CELL_MEASURES).reset_index()
+        result['Mark_Mean'] = result['Mark_Sum'] / result['Count']
+
+        if distinct:
+            # Merging the student sets of the cells of every group
+            group_ids = grouped.ngroup().to_numpy()
+            student_ids, positions = self._cell_students(selected)
+            group_of_student = group_ids[positions]
+            in_group = group_of_student >= 0
+            pairs = np.unique(group_of_student[in_group].astype(np.int64) * self._n_ids + student_ids[in_group])
+            result['Students'] = np.bincount(pairs // self._n_ids, minlength=len(result))
+        return result
@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+
+from pipeline.recode import recoded_categorical
+from sessions import canonical_session_column
+
+# Bumped whenever the normalisation below changes, so snapshots written by
+# an older version are not read back
+SCHEMA_VERSION = 4
+
+# Orders of the ranked categorical columns
+CLASSIFICATION_ORDER = ['First Class', 'Second Class Upper', 'Second Class Lower', 'Third Class', 'Pass', 'Fail']
+GRADE_ORDER = ['A', 'B', 'C', 'D', 'E', 'F']
+
+# Target type of each column, per dataframe:
+# - 'session': canonical session labels, as an ordered categorical in
+#   chronological order
+# - a list: ordered categorical with that order
+# - 'category': categorical of the distinct values
+# - anything else: a numeric dtype to downcast to
+SCHEMA = {
+    "Academic_Performance": {
+        'Session': 'session',
+        'GPA': 'float32',
+        'CGPA': 'float32',
+        'GPA_Classification': CLASSIFICATION_ORDER,
+        'CGPA_Classification': CLASSIFICATION_ORDER,
+    },
+    "Biodata": {
+        'Sex': 'category',
+        'State_of_Origin': 'category',
+        'Nationality': 'category',
+        'Religion': 'category',
+        'Marital_Status': 'category',
+    },
+    "First_and_Last_Result": {
+        'First_Session': 'session',
+        'Last_Session': 'session',
+        'First_GPA': 'float32',
+        'First_CGPA': 'float32',
+        'Last_GPA': 'float32',
+        'Last_CGPA': 'float32',
+        'First_GPA_Classification': CLASSIFICATION_ORDER,
+        'First_CGPA_Classification': CLASSIFICATION_ORDER,
+        'Last_GPA_Classification': CLASSIFICATION_ORDER,
+        'Last_CGPA_Classification': CLASSIFICATION_ORDER,
+    },
+    "Registration": {
+        'Session': 'session',
+        'Level': 'uint16',
+    },
+    "Result_Sheet": {
+        'Session': 'session',
+        'Level': 'uint16',
+        'Course_Code': 'category',
+        'Course_Title': 'category',
+        'Lecturer': 'category',
+        'Mark': 'int16',
+        'Grade': GRADE_ORDER,
+    },
+}
+
+
+# Values corrected once at load time, before the columns are converted
+VALUE_FIXES = {
+    "Biodata": {
+        # Missing states of origin were filled with '-' when the data was cleaned
+        'State_of_Origin': {'-': 'Unknown'},
+    },
+}
+
+# Integer columns whose missing entries are shown as 0 (an unknown Level
+# has always been reported as level 0)
+MISSING_AS_ZERO = {'Level'}
+
+
+def _normalise_column(column, spec):
+    if spec == 'session':
+        return canonical_session_column(column)
+    if isinstance(spec, list):
+        # Values outside the listed order are kept, after it
+        extra = sorted(set(column.dropna().unique()) - set(spec))
+        return pd.Categorical(column, categories=spec + extra, ordered=True)
+    if spec == 'category':
+        return column.astype('category')
+
+    # Numeric columns; entries that are not numbers, such as the '-' of an
+    # unknown Level, become missing
+    column = pd.to_numeric(column, errors='coerce')
+    if np.issubdtype(np.dtype(spec), np.integer):
+        if column.name in MISSING_AS_ZERO:
+            column = column.fillna(0)
+        elif column.isna().any():
+            # Nullable integers keep the missing values missing
+            return column.astype(spec.replace('int', 'Int').replace('uInt', 'UInt'))
+    return column.astype(spec)
+
+
+def _replace_values(column, replacements):
+    if not isinstance(column.dtype, pd.CategoricalDtype):
+        return column.replace(replacements)
+
+    # Categorical columns (e.g. Biodata read back from a Parquet dataset) are
+    # fixed on their categories, which may merge some of them
+    recoded = column.cat.categories.to_series().replace(replacements)
+    return pd.Series(recoded_categorical(column.cat.codes, recoded), index=column.index, name=column.name)
+
+
+def normalise(name, df):
+    """Apply VALUE_FIXES and convert the columns of a dataframe to the types given in SCHEMA."""
+    df = df.copy()
+    for column, replacements in VALUE_FIXES.get(name, {}).items():
+        if column in df.columns:
+            df[column] = _replace_values(df[column], replacements)
+    for column, spec in SCHEMA.get(name, {}).items():
+        if column in df.columns:
+            df[column] = _normalise_column(df[column], spec)
+    return df
@@ -0,0 +1,66 @@
+import re
+
+import pandas as pd
+
+from pipeline.recode import recoded_categorical
+
+# Session labels entered in other formats, mapped to their canonical form
+SESSION_ALIASES = {
+    '97/98': '1997-1998',
+    '90-92': '1990-1991',
+}
+
+
+def canonical_session(label):
+    """Return the canonical form of a session label, e.g. '1997-1998' for '97/98'."""
+    label = str(label).strip()
+    return SESSION_ALIASES.get(label, label)
+
+
+def session_start_year(label):
+    """Integer sort key of a session: the year it starts in (None if unknown)."""
+    match = re.match(r'(\d+)', canonical_session(label))
+    if match is None:
+        return None
+    year = int(match.group(1))
+    if year < 100:
+        # Two-digit years, as in '97/98'
+        year += 1900 if year >= 50 else 2000
+    return year
+
+
+def _chronological(labels):
+    # Sessions without a year go last
+    return sorted(labels, key=lambda label: (session_start_year(label) is None,
+                                             session_start_year(label) or 0, label))
+
+
+def canonical_session_column(column):
+    """Canonicalise a column of session labels into an ordered categorical.
+
+    Only the distinct labels are mapped, and the categories are in
+    chronological order, so sorting or comparing sessions works on the
+    integer codes.
+    """
+    codes, labels = pd.factorize(column)
+    canonical = [canonical_session(label) for label in labels]
+    return recoded_categorical(codes, canonical, _chronological(set(canonical)), ordered=True)
+
+
+def session_dimension(*columns):
+    """Session dimension table of one or more session columns.
+
+    One row per canonical session present in the columns, in chronological
+    order, with its start year and an integer sort key. Pages take their
+    session orderings from here instead of hand-written lists.
+    """
+    labels = set()
+    for column in columns:
+        labels.update(column.cat.categories if isinstance(column.dtype, pd.CategoricalDtype)
+                      else column.dropna().map(canonical_session).unique())
+    labels = _chronological(labels)
+    return pd.DataFrame({
+        'Session': labels,
+        'Start_Year': pd.array([session_start_year(label) for label in labels], dtype='Int16'),
+        'Sort_Key': range(len(labels)),
+    })
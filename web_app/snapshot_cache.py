@@ -0,0 +1,98 @@
+import hashlib
+import os
+import tempfile
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from pipeline.parquet import arrow_safe
+
+# Directory holding the columnar snapshots of the workbook
+# (can be moved with the STUDENT_DATA_SNAPSHOT_DIR environment variable)
+base_dir = os.path.dirname(__file__)
+snapshot_dir = os.environ.get('STUDENT_DATA_SNAPSHOT_DIR', os.path.join(base_dir, '.snapshots'))
+
+# Extension of the Arrow IPC (Feather v2) file written for each sheet
+SNAPSHOT_EXTENSION = '.arrow'
+
+# Schema metadata entry holding the content hash of a snapshot
+CONTENT_HASH_KEY = b'content_hash'
+
+
+def frame_hash(df):
+    """Content hash of a dataframe: its columns, dtypes and values."""
+    digest = hashlib.sha256(repr(list(zip(df.columns, map(str, df.dtypes)))).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:24]
+
+
+def snapshot_path(name, key):
+    # Every sheet has its own directory of snapshots, one per key
+    return os.path.join(snapshot_dir, name, key + SNAPSHOT_EXTENSION)
+
+
+def _content_hash(table):
+    return (table.schema.metadata or {}).get(CONTENT_HASH_KEY, b'').decode() or None
+
+
+def read_snapshot(name, key):
+    """Read the snapshot of a sheet as (dataframe, content hash), or None if missing."""
+    path = snapshot_path(name, key)
+    if not os.path.exists(path):
+        return None
+    table = feather.read_table(path)
+    return table.to_pandas(), _content_hash(table)
+
+
+def _string_dtype(arrow_type):
+    # Arrow strings are wrapped as pyarrow-backed pandas strings instead of
+    # being converted to Python objects
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return pd.StringDtype('pyarrow')
+    return None
+
+
+def map_snapshot(name, key):
+    """Memory-map the snapshot of a sheet read-only, as (dataframe, content hash).
+
+    The dataframe wraps the mapped Arrow buffers without copying them:
+    numeric columns without missing values and string columns point into
+    the page cache, which every process mapping the same file shares.
+    Returns None if the sheet has no snapshot under the key.
+    """
+    path = snapshot_path(name, key)
+    if not os.path.exists(path):
+        return None
+    table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+    return table.to_pandas(split_blocks=True, types_mapper=_string_dtype), _content_hash(table)
+
+
+def write_snapshot(name, key, df, content_hash):
+    """Write a sheet as an Arrow IPC file under its key.
+
+    The file is written under a temporary name and renamed into place, so
+    a concurrently starting replica never reads a half-written sheet.
+    Older snapshots of the same sheet are removed; processes that still
+    map them keep their pages until they let go of them.
+    """
+    sheet_dir = os.path.join(snapshot_dir, name)
+    os.makedirs(sheet_dir, exist_ok=True)
+
+    table = pa.Table.from_pandas(arrow_safe(df), preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}),
+                                           CONTENT_HASH_KEY: content_hash.encode()})
+    handle, staging_path = tempfile.mkstemp(prefix='.staging-', dir=sheet_dir)
+    os.close(handle)
+    try:
+        # Uncompressed so the files can later be memory-mapped as they are
+        feather.write_feather(table, staging_path, compression='uncompressed')
+        os.replace(staging_path, snapshot_path(name, key))
+    except BaseException:
+        os.remove(staging_path)
+        raise
+
+    # Removing the snapshots of previous versions of the sheet
+    for entry in os.listdir(sheet_dir):
+        if entry != key + SNAPSHOT_EXTENSION and not entry.startswith('.staging-'):
+            os.remove(os.path.join(sheet_dir, entry))
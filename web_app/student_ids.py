@@ -0,0 +1,68 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from pipeline.recode import remap_codes
+
+
+class StudentIndex:
+    """Dictionary mapping every matric number to a dense int32 student id.
+
+    One index is shared by all the sheets, so the same student gets the
+    same id everywhere. Sheets are loaded lazily, so the dictionary grows
+    as they are encoded: ids are only stable within a process.
+    """
+
+    def __init__(self):
+        self._matric_numbers = pd.Index([], dtype=object)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._matric_numbers)
+
+    def encode(self, matric_numbers):
+        """Return the student ids of a column of matric numbers (-1 where missing)."""
+        # Only the distinct matric numbers are looked up in the dictionary
+        codes, uniques = pd.factorize(matric_numbers)
+        with self._lock:
+            positions = self._matric_numbers.get_indexer(uniques)
+            if (positions < 0).any():
+                self._matric_numbers = self._matric_numbers.append(pd.Index(uniques[positions < 0], dtype=object))
+                positions = self._matric_numbers.get_indexer(uniques)
+        return remap_codes(codes, positions).astype(np.int32)
+
+    def decode(self, student_ids):
+        """Return the matric numbers of an array of student ids."""
+        return self._matric_numbers.take(student_ids)
+
+
+def count_distinct(student_ids):
+    """Number of distinct students in an array of student ids."""
+    student_ids = np.asarray(student_ids)
+    student_ids = student_ids[student_ids >= 0]
+    if len(student_ids) == 0:
+        return 0
+    return int(np.count_nonzero(np.bincount(student_ids)))
+
+
+def distinct_students(df, by, name='Matric_Number', id_column='Student_Id'):
+    """Distinct student count per group, from the integer student ids.
+
+    Equivalent to df.groupby(by)['Matric_Number'].nunique().reset_index(),
+    with the count in a column called `name`. The groups and ids are
+    packed into one int64 per row and deduplicated with a sort, instead
+    of hashing the matric number strings of every group.
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    grouped = df.groupby(by, observed=True, sort=True)
+    result = grouped.size().index.to_frame(index=False)
+
+    group_ids = grouped.ngroup().to_numpy()
+    student_ids = df[id_column].to_numpy()
+    present = (group_ids >= 0) & (student_ids >= 0)
+    n_ids = int(student_ids.max()) + 1 if present.any() else 1
+
+    pairs = np.unique(group_ids[present].astype(np.int64) * n_ids + student_ids[present])
+    result[name] = np.bincount(pairs // n_ids, minlength=len(result))
+    return result
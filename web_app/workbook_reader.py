@@ -0,0 +1,129 @@
+import hashlib
+import io
+import logging
+import os
+import posixpath
+import time
+import zipfile
+import xml.etree.ElementTree as ET
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Workbooks smaller than this are parsed serially, where starting the
+# worker processes would cost more than it saves
+PARALLEL_THRESHOLD = 8 * 1024 * 1024  # bytes
+
+# XML namespaces of the workbook parts of an .xlsx file
+_MAIN_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_REL_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+_PACKAGE_REL_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+# Parse time and row count of one sheet
+SheetReport = namedtuple('SheetReport', ['sheet', 'rows', 'seconds'])
+
+# Workbook content shared with the worker processes
+_workbook_content = None
+
+
+def _init_worker(content):
+    global _workbook_content
+    _workbook_content = content
+
+
+def _parse_sheet(sheet_name):
+    start = time.perf_counter()
+    df = pd.read_excel(io.BytesIO(_workbook_content), sheet_name=sheet_name)
+    return sheet_name, df, time.perf_counter() - start
+
+
+def _read_serial(path, sheet_names):
+    # One ExcelFile opens the zip and parses the shared strings table once
+    # for all the sheets
+    frames, reports = {}, []
+    with pd.ExcelFile(path) as workbook:
+        for sheet_name in sheet_names:
+            start = time.perf_counter()
+            frames[sheet_name] = workbook.parse(sheet_name)
+            reports.append(SheetReport(sheet_name, len(frames[sheet_name]), time.perf_counter() - start))
+    return frames, reports
+
+
+def _read_parallel(path, sheet_names, max_workers):
+    # The file is read from disk once and handed to the workers, each of
+    # which parses a single sheet, so small sheets never wait on large ones
+    with open(path, 'rb') as workbook:
+        content = workbook.read()
+
+    frames, reports = {}, []
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                             initargs=(content,)) as pool:
+        futures = [pool.submit(_parse_sheet, sheet_name) for sheet_name in sheet_names]
+        for future in as_completed(futures):
+            sheet_name, df, seconds = future.result()
+            frames[sheet_name] = df
+            reports.append(SheetReport(sheet_name, len(df), seconds))
+    return {sheet_name: frames[sheet_name] for sheet_name in sheet_names}, reports
+
+
+def read_workbook(path, sheet_names, max_workers=None, parallel_threshold=PARALLEL_THRESHOLD):
+    """Parse several sheets of an Excel workbook in one pass.
+
+    Large workbooks are parsed in a process pool with one sheet per task;
+    small ones, or hosts with a single core, are parsed serially. Returns
+    the dataframes keyed by sheet name and a SheetReport per sheet, which
+    is also logged.
+    """
+    sheet_names = list(sheet_names)
+    if max_workers is None:
+        max_workers = min(len(sheet_names), os.cpu_count() or 1)
+
+    frames = None
+    if max_workers > 1 and os.path.getsize(path) >= parallel_threshold:
+        try:
+            frames, reports = _read_parallel(path, sheet_names, max_workers)
+        except (OSError, BrokenProcessPool):
+            logger.warning("Parallel parsing of %s failed, parsing serially", path, exc_info=True)
+    if frames is None:
+        frames, reports = _read_serial(path, sheet_names)
+
+    for report in reports:
+        logger.info("Parsed sheet %s: %d rows in %.2fs", report.sheet, report.rows, report.seconds)
+    return frames, reports
+
+
+def sheet_fingerprints(path, sheet_names):
+    """Fingerprint each sheet of an .xlsx workbook without parsing it.
+
+    A sheet's fingerprint combines the CRC32 and size of its XML part,
+    read from the zip directory, with those of the shared strings table
+    its cells point into. A sheet whose fingerprint is unchanged has the
+    same content; a changed fingerprint may still turn out to hold the
+    same data (e.g. when only the shared strings moved).
+    """
+    with zipfile.ZipFile(path) as workbook:
+        # Locating the XML part of every sheet through the workbook relationships
+        relationships = ET.fromstring(workbook.read('xl/_rels/workbook.xml.rels'))
+        targets = {rel.get('Id'): rel.get('Target') for rel in relationships.iter(_PACKAGE_REL_NS + 'Relationship')}
+        parts = {}
+        for sheet in ET.fromstring(workbook.read('xl/workbook.xml')).iter(_MAIN_NS + 'sheet'):
+            target = targets[sheet.get(_REL_NS + 'id')]
+            parts[sheet.get('name')] = target.lstrip('/') if target.startswith('/') else posixpath.join('xl', target)
+
+        def part_signature(part):
+            try:
+                info = workbook.getinfo(part)
+            except KeyError:
+                return ''
+            return f"{info.CRC:08x}:{info.file_size}"
+
+        shared_strings = part_signature('xl/sharedStrings.xml')
+        fingerprints = {}
+        for sheet_name in sheet_names:
+            signature = f"{part_signature(parts[sheet_name])}/{shared_strings}"
+            fingerprints[sheet_name] = hashlib.sha256(signature.encode()).hexdigest()[:24]
+    return fingerprints